@@ -0,0 +1,104 @@
+"""Compare the BeautifulSoup link extraction with the streaming link_extractor.iter_links.
+
+Usage (from the repository root):
+    python benchmarks/link_extractor_benchmark.py [--pages saved_homepages/*.html] [--stop_after 50]
+
+Without --pages a synthetic homepage with a few thousand links is generated.
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+import tracemalloc
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bs4 import BeautifulSoup
+from link_extractor import iter_links
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description="Homepage link extraction benchmark")
+    parser.add_argument("--pages", nargs="*", default=[], help="Saved homepage HTML files (globs allowed)")
+    parser.add_argument("--stop_after", type=int, default=50, help="Links consumed in the early-stop scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed passes per extractor")
+    return parser.parse_args()
+
+
+def synthetic_homepage(num_links=3000, seed=7):
+    """Build a homepage-sized document with navigation, story links and inline scripts."""
+    rng = random.Random(seed)
+    parts = ["<!DOCTYPE html><html><head><title>Local News</title>"]
+    parts.append("<script>" + "var x = 1;" * 2000 + "</script></head><body><nav>")
+    for section in ["news", "sports", "opinion", "obituaries", "weather", "business"]:
+        parts.append(f'<a href="/{section}/" class="nav">{section.title()}</a>')
+    parts.append("</nav><main>")
+    for i in range(num_links):
+        slug = "-".join(rng.choice(["city", "council", "school", "board", "fire", "park", "storm", "road"]) for _ in range(5))
+        parts.append(
+            f'<article><h2><a href="/news/2025/{rng.randint(1, 12):02d}/{slug}-{i}.html">Headline {i}</a></h2>'
+            f'<p>{"Lorem ipsum dolor sit amet. " * 8}</p><img src="/img/{i}.jpg" alt=""></article>'
+        )
+    parts.append("</main></body></html>")
+    return "".join(parts)
+
+
+def bs4_extract(html_content, base_url):
+    """The previous crawler_v3.extract_article_urls_from_html without the redirect HEAD."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    return {urljoin(base_url, link['href']) for link in soup.find_all("a", href=True)}
+
+
+def measure(repeat, func):
+    """Return the best wall time and the peak traced memory of func()."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def main():
+    args = get_arguments()
+    paths = [path for pattern in args.pages for path in glob.glob(pattern)]
+    if paths:
+        pages = []
+        for path in paths:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append((path, f.read()))
+    else:
+        pages = [("synthetic", synthetic_homepage())]
+
+    base_url = "https://example.com/"
+    for name, html_content in pages:
+        bs4_links = bs4_extract(html_content, base_url)
+        streamed_links = list(iter_links(html_content, base_url))
+        if set(streamed_links) != bs4_links:
+            print(f"WARNING: {name}: link sets differ ({len(bs4_links)} vs {len(set(streamed_links))})")
+
+        def early_stop():
+            for i, _ in enumerate(iter_links(html_content, base_url)):
+                if i + 1 >= args.stop_after:
+                    break
+
+        size_mb = len(html_content.encode("utf-8")) / 1e6
+        print(f"{name}: {size_mb:.2f} MB, {len(bs4_links)} links")
+        for label, func in [
+            ("BeautifulSoup", lambda: bs4_extract(html_content, base_url)),
+            ("iter_links (all)", lambda: list(iter_links(html_content, base_url))),
+            (f"iter_links (first {args.stop_after})", early_stop),
+        ]:
+            elapsed, peak = measure(args.repeat, func)
+            print(f"  {label:<24} {elapsed * 1000:9.1f} ms  {size_mb / elapsed:7.1f} MB/s  peak {peak / 1e6:7.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
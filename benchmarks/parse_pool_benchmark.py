@@ -0,0 +1,72 @@
+"""Compare parsing feeds and homepages in 20 discovery threads with the --parse_workers process pool.
+
+Usage (from the repository root):
+    python benchmarks/parse_pool_benchmark.py [--pages 200] [--workers 4 8]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from link_extractor_benchmark import synthetic_homepage
+from parse_pool import ParsePool, parse_feed
+from link_extractor import iter_links
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description="Discovery parsing throughput benchmark")
+    parser.add_argument("--pages", type=int, default=200, help="Number of feed + homepage pairs to parse")
+    parser.add_argument("--workers", type=int, nargs="*", default=[2, 4, os.cpu_count() or 1], help="Parse pool sizes to try")
+    parser.add_argument("--chunk_size", type=int, default=200, help="Homepage links in the first parse-worker task")
+    return parser.parse_args()
+
+
+def synthetic_feed(num_items=100):
+    items = "".join(
+        f"<item><title>Story {i}</title><link>https://example.com/news/story-{i}.html</link>"
+        f"<pubDate>Mon, 06 Jan 2025 10:{i % 60:02d}:00 GMT</pubDate>"
+        f"<description>{'Lorem ipsum dolor sit amet. ' * 40}</description></item>"
+        for i in range(num_items)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Local</title>{items}</channel></rss>'.encode()
+
+
+def run(pages, parse_page):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        list(executor.map(parse_page, range(pages)))
+    return time.perf_counter() - start
+
+
+def main():
+    args = get_arguments()
+    feed = synthetic_feed()
+    homepage = synthetic_homepage(1500)
+    headers = {"content-type": "application/rss+xml"}
+
+    def in_threads(_):
+        parse_feed(feed, headers)
+        list(iter_links(homepage, "https://example.com/"))
+
+    elapsed = run(args.pages, in_threads)
+    print(f"threads only        {elapsed:7.2f} s  {args.pages / elapsed:7.1f} pages/s")
+
+    for workers in args.workers:
+        pool = ParsePool(workers, args.chunk_size)
+        # Warm up the spawned workers so start-up is not timed.
+        pool.parse_feed(feed, headers)
+
+        def in_pool(_):
+            pool.parse_feed(feed, headers)
+            list(pool.iter_links(homepage, "https://example.com/"))
+
+        elapsed = run(args.pages, in_pool)
+        pool.shutdown()
+        print(f"parse pool ({workers:2d} proc) {elapsed:7.2f} s  {args.pages / elapsed:7.1f} pages/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compare per-URL StorySniffer.guess with BatchStorySniffer.guess_many.
+
+Also checks that model verdicts survive a save/load round trip of the verdict cache.
+
+Usage (from the repository root):
+    python benchmarks/sniffer_benchmark.py [--urls benchmarks/fixtures/candidate_urls.txt] [--batch_size 64]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from storysniffer import StorySniffer
+from story_classifier import BatchStorySniffer
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description="StorySniffer throughput benchmark")
+    parser.add_argument("--urls", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "candidate_urls.txt"), help="File with one candidate URL per line")
+    parser.add_argument("--batch_size", type=int, default=64, help="Batch size for guess_many")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed passes per mode")
+    return parser.parse_args()
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    args = get_arguments()
+    with open(args.urls) as f:
+        urls = [line.strip() for line in f if line.strip()]
+
+    sniffer = StorySniffer()
+    # max_cache_size=0 keeps the cache empty so every pass measures classification
+    batch_sniffer = BatchStorySniffer(max_cache_size=0)
+    cached_sniffer = BatchStorySniffer()
+    cached_sniffer.guess_many(urls)
+
+    def batched():
+        verdicts = []
+        for i in range(0, len(urls), args.batch_size):
+            verdicts.extend(batch_sniffer.guess_many(urls[i:i + args.batch_size]))
+        return verdicts
+
+    single_time, single = best_of(args.repeat, lambda: [sniffer.guess(url) for url in urls])
+    batch_time, batch = best_of(args.repeat, batched)
+    cached_time, cached = best_of(args.repeat, lambda: cached_sniffer.guess_many(urls))
+
+    if single != batch or single != cached:
+        mismatches = sum(a != b for a, b in zip(single, batch))
+        print(f"WARNING: batched verdicts differ from per-URL verdicts for {mismatches} URLs")
+
+    print(f"URLs: {len(urls)}, stories: {sum(single)}")
+    print(f"per-URL guess:            {single_time:8.3f}s  {len(urls) / single_time:10.0f} URLs/s")
+    print(f"guess_many (batch {args.batch_size:>4}): {batch_time:8.3f}s  {len(urls) / batch_time:10.0f} URLs/s")
+    print(f"guess_many (cached):      {cached_time:8.3f}s  {len(urls) / cached_time:10.0f} URLs/s")
+
+    model_urls = [url for url in urls if cached_sniffer._rule_verdict(url) is None]
+    with tempfile.TemporaryDirectory() as tmp:
+        cached_sniffer.cache_path = os.path.join(tmp, "sniffer_cache.json.gz")
+        cached_sniffer.save()
+        reloaded = BatchStorySniffer(cached_sniffer.cache_path)
+        round_trip = reloaded.guess_many(urls)
+        leftovers = [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+    if round_trip != cached or reloaded.misses or leftovers:
+        print(f"WARNING: verdict cache round trip failed ({reloaded.misses} misses after reload, leftover files {leftovers})")
+        sys.exit(1)
+    print(f"cache round trip:         {len(round_trip)} verdicts reloaded, {len(model_urls)} from the model")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Exercise ResumableUploader against a local S3 stand-in that injects failures.
+
+Checks that single PUTs and multipart uploads survive injected 503s, that an
+interrupted multipart upload resumes from the journal without resending finished
+parts, and that --upload_bandwidth paces multipart parts while they are sent.
+
+Usage (from the repository root):
+    python benchmarks/upload_fault_injection.py [--fail_every 3] [--bandwidth 4000000]
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from resumable_upload import ResumableUploader
+from upload_journal import UploadJournal
+from upload_scheduler import UploadScheduler
+
+PART_SIZE = 5 * 1024 * 1024
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description="Resumable upload fault-injection check")
+    parser.add_argument("--fail_every", type=int, default=3, help="Answer every Nth request with a 503")
+    parser.add_argument("--bandwidth", type=int, default=4000000, help="Bytes per second for the throttled multipart check")
+    return parser.parse_args()
+
+
+class FakeS3:
+    """In-memory S3 stand-in for PUT object and multipart uploads, failing every `fail_every`-th request."""
+
+    def __init__(self, fail_every=0):
+        self.fail_every = fail_every
+        self.requests = 0
+        self.objects = {}
+        self.uploads = {}
+        self.part_puts = []
+        self.part_timings = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_PUT(self):
+                server.handle(self, "PUT")
+
+            def do_POST(self):
+                server.handle(self, "POST")
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.endpoint = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def read_body(self, handler):
+        """Read the request body, recording when the first and last chunks arrived."""
+        remaining = int(handler.headers.get("Content-Length", 0))
+        chunks = []
+        first = last = time.monotonic()
+        while remaining:
+            chunk = handler.rfile.read(min(65536, remaining))
+            if not chunk:
+                break
+            if not chunks:
+                first = time.monotonic()
+            last = time.monotonic()
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks), last - first
+
+    def reply(self, handler, status, body=b"", headers=None):
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def handle(self, handler, method):
+        parts = urlsplit(handler.path)
+        key = parts.path
+        query = parse_qs(parts.query, keep_blank_values=True)
+        body, transfer_seconds = self.read_body(handler)
+        with self._lock:
+            self.requests += 1
+            if self.fail_every and self.requests % self.fail_every == 0:
+                return self.reply(handler, 503, b"<Error><Code>SlowDown</Code></Error>")
+
+            if method == "POST" and "uploads" in query:
+                upload_id = f"upload-{len(self.uploads) + 1}"
+                self.uploads[upload_id] = {}
+                return self.reply(handler, 200, f"<InitiateMultipartUploadResult><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>".encode())
+            if method == "PUT" and "partNumber" in query:
+                upload_id, number = query["uploadId"][0], int(query["partNumber"][0])
+                if upload_id not in self.uploads:
+                    return self.reply(handler, 404, b"<Error><Code>NoSuchUpload</Code></Error>")
+                self.uploads[upload_id][number] = body
+                self.part_puts.append(number)
+                self.part_timings.append((len(body), transfer_seconds))
+                return self.reply(handler, 200, headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+            if method == "POST" and "uploadId" in query:
+                upload = self.uploads.pop(query["uploadId"][0])
+                self.objects[key] = b"".join(upload[number] for number in sorted(upload))
+                return self.reply(handler, 200, b"<CompleteMultipartUploadResult/>")
+            if method == "PUT":
+                self.objects[key] = body
+                return self.reply(handler, 200, headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+        return self.reply(handler, 400)
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def make_file(directory, name, size):
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def check(label, passed, detail=""):
+    print(f"{'PASS' if passed else 'FAIL'}  {label}{'  ' + detail if detail else ''}")
+    return passed
+
+
+def uploader(journal, server, **kwargs):
+    options = dict(multipart_threshold=2 * PART_SIZE, part_size=PART_SIZE, retries=5, backoff=0.01, max_backoff=0.05)
+    options.update(kwargs)
+    return ResumableUploader(journal, endpoint=server.endpoint, access_key="key", secret_key="secret", **options)
+
+
+class Interrupt(Exception):
+    pass
+
+
+def main():
+    args = get_arguments()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        small = make_file(tmp, "small.warc.gz", 1024 * 1024)
+        large = make_file(tmp, "large.warc.gz", 3 * PART_SIZE + 12345)
+        with open(large, "rb") as f:
+            large_bytes = f.read()
+
+        # Retries of single PUTs and multipart requests answered with 503.
+        server = FakeS3(args.fail_every)
+        journal = UploadJournal(os.path.join(tmp, "journal.sqlite3"))
+        client = uploader(journal, server)
+        client.upload(small, "item", "small.warc.gz")
+        client.upload(large, "item", "large.warc.gz")
+        with open(small, "rb") as f:
+            results.append(check("single PUT survives injected 503s", server.objects.get("/item/small.warc.gz") == f.read()))
+        results.append(check("multipart upload survives injected 503s", server.objects.get("/item/large.warc.gz") == large_bytes))
+        results.append(check("journal skips a finished file", client.upload(large, "item", "large.warc.gz") is False))
+        journal.close()
+        server.close()
+
+        # A crash after two parts resumes from the journal with the same upload id.
+        server = FakeS3()
+        journal_path = os.path.join(tmp, "resume.sqlite3")
+        journal = UploadJournal(journal_path)
+        opened = []
+
+        def crash_on_third_part(path):
+            opened.append(path)
+            if len(opened) == 3:
+                raise Interrupt("simulated crash")
+            return open(path, "rb")
+
+        try:
+            uploader(journal, server, open_file=crash_on_third_part, retries=0).upload(large, "item", "resumed.warc.gz")
+        except Interrupt:
+            pass
+        journal.close()
+        sent_before = list(server.part_puts)
+        journal = UploadJournal(journal_path)
+        uploader(journal, server).upload(large, "item", "resumed.warc.gz")
+        resent = [number for number in server.part_puts[len(sent_before):] if number in sent_before]
+        results.append(check("interrupted multipart upload resumes", server.objects.get("/item/resumed.warc.gz") == large_bytes,
+                             f"parts before crash {sent_before}, after {server.part_puts[len(sent_before):]}"))
+        results.append(check("finished parts are not resent", not resent))
+        journal.close()
+        server.close()
+
+        # Parts are paced while they are sent rather than read in one burst.
+        server = FakeS3()
+        scheduler = UploadScheduler(1, args.bandwidth)
+        journal = UploadJournal(os.path.join(tmp, "throttled.sqlite3"))
+        start = time.monotonic()
+        uploader(journal, server, open_file=scheduler.open).upload(large, "item", "throttled.warc.gz")
+        elapsed = time.monotonic() - start
+        # The short last part arrives in one read, so only full parts show the pacing.
+        rates = [size / seconds if seconds > 0 else float("inf") for size, seconds in server.part_timings if size == PART_SIZE]
+        peak = max(rates) if rates else float("inf")
+        results.append(check("throttled multipart upload completes", server.objects.get("/item/throttled.warc.gz") == large_bytes,
+                             f"{len(large_bytes) / elapsed / 1e6:.1f} MB/s overall with a {args.bandwidth / 1e6:.1f} MB/s cap"))
+        results.append(check("each part is paced while it is sent", peak < 2 * args.bandwidth,
+                             f"fastest part arrived at {peak / 1e6:.1f} MB/s"))
+        journal.close()
+        server.close()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
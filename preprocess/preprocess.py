@@ -1,9 +1,22 @@
 import json
 import gzip
+import argparse
+import os
+import sys
+import sqlite3
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 import logging
 from collections import defaultdict
+from itertools import zip_longest
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from http_client import HEADERS, HttpClient
 
 # === Logging Setup ===
 logging.basicConfig(
@@ -13,47 +26,126 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# === Command line options ===
+parser = argparse.ArgumentParser(description="Refresh website_status_code for every outlet")
+parser.add_argument("--concurrency", type=int, default=64, help="Number of websites checked at once")
+parser.add_argument("--per_host", type=int, default=2, help="Maximum concurrent checks against one host")
+parser.add_argument("--timeout", type=float, default=5, help="Request timeout in seconds")
+parser.add_argument("--status_cache", default="status_cache.sqlite3", help="Cache of the last status of each website")
+parser.add_argument("--healthy_days", type=float, default=30, help="Days before a healthy website is checked again")
+parser.add_argument("--failing_days", type=float, default=1, help="Days before a failing website is checked again; doubles with each consecutive failure up to --healthy_days")
+parser.add_argument("--full", action="store_true", help="Check every website regardless of the cache")
+args = parser.parse_args()
+
+# One pooled client shared by all workers so connections to a host are reused.
+client = HttpClient(HEADERS, timeout=args.timeout, pool_hosts=args.concurrency, pool_size=args.per_host)
+
+host_slots = defaultdict(lambda: threading.BoundedSemaphore(args.per_host))
+host_slots_lock = threading.Lock()
+
 # === Website status check function ===
 def check_website_status(url):
-    try:
-        response = requests.head(url, timeout=5, allow_redirects=True)
-        return response.status_code
-    except requests.RequestException as e:
-        logging.warning(f"Failed to reach {url} - {str(e)}")
-        return None
+    host = urlsplit(url).hostname or ""
+    with host_slots_lock:
+        slot = host_slots[host]
+    with slot:
+        try:
+            response = client.head(url, allow_redirects=True)
+            return response.status_code
+        except requests.RequestException as e:
+            logging.warning(f"Failed to reach {url} - {str(e)}")
+            return None
+
+def is_healthy(status_code):
+    return status_code is not None and status_code < 400
+
+def is_stale(entry, now):
+    """Return True if a cached (status, checked_at, failure_streak) entry is due for a re-check."""
+    status_code, checked_at, failure_streak = entry
+    if failure_streak:
+        interval = min(args.healthy_days, args.failing_days * 2 ** (failure_streak - 1))
+    else:
+        interval = args.healthy_days
+    return now - checked_at >= interval * 86400
+
+def interleave_by_host(urls):
+    """Order URLs round-robin across hosts so workers rarely wait on the same host."""
+    by_host = defaultdict(list)
+    for url in urls:
+        by_host[urlsplit(url).hostname or ""].append(url)
+    return [url for group in zip_longest(*by_host.values()) for url in group if url is not None]
 
 # === Load Gzipped JSON ===
 input_file = 'output.json.gz'
 with gzip.open(input_file, 'rt', encoding='utf-8') as f:
     data = json.load(f)
 
+# === Load Status Cache ===
+cache = sqlite3.connect(args.status_cache)
+cache.execute("CREATE TABLE IF NOT EXISTS status (url TEXT PRIMARY KEY, status INTEGER, checked_at REAL, failure_streak INTEGER)")
+cached_status = {
+    url: (status_code, checked_at, failure_streak)
+    for url, status_code, checked_at, failure_streak in cache.execute("SELECT url, status, checked_at, failure_streak FROM status")
+}
+
 # === Initialize counters and progress ===
 status_counter = defaultdict(int)
 
-total_outlets = sum(
-    len(outlets)
-    for state in data.values()
-    for outlets in state.values()
-)
+# Outlets sharing a website are checked once.
+outlets_by_website = defaultdict(list)
+for state, media_types in data.items():
+    for media_type, outlets in media_types.items():
+        for outlet in outlets:
+            outlets_by_website[outlet.get('website')].append(outlet)
+
+total_outlets = sum(len(outlets) for outlets in outlets_by_website.values())
+
+# Only websites that are new or whose cached status is stale are checked.
+now = time.time()
+to_check = [
+    website for website in outlets_by_website
+    if website and (args.full or website not in cached_status or is_stale(cached_status[website], now))
+]
 
 # === Process Each Website ===
 with tqdm(total=total_outlets, desc="Checking websites", unit="site") as pbar:
-    for state, media_types in data.items():
-        for media_type, outlets in media_types.items():
-            for outlet in outlets:
-                website = outlet.get('website')
-                if website:
-                    status_code = check_website_status(website)
-                else:
-                    status_code = None
-                outlet['website_status_code'] = status_code
-                status_counter[status_code] += 1
-                pbar.update(1)
+    def record(website, status_code):
+        for outlet in outlets_by_website[website]:
+            outlet['website_status_code'] = status_code
+            status_counter[status_code] += 1
+        pbar.update(len(outlets_by_website[website]))
+
+    pending = set(to_check)
+    for website in outlets_by_website:
+        if not website:
+            record(website, None)
+        elif website not in pending:
+            record(website, cached_status[website][0])
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = {
+            executor.submit(check_website_status, website): website
+            for website in interleave_by_host(to_check)
+        }
+        for future in as_completed(futures):
+            website, status_code = futures[future], future.result()
+            previous_streak = cached_status.get(website, (None, 0, 0))[2]
+            failure_streak = 0 if is_healthy(status_code) else previous_streak + 1
+            cache.execute(
+                "INSERT OR REPLACE INTO status (url, status, checked_at, failure_streak) VALUES (?, ?, ?, ?)",
+                (website, status_code, time.time(), failure_streak)
+            )
+            record(website, status_code)
+
+cache.commit()
+cache.close()
+client.close()
 
 # === Save Updated Data ===
 output_file = 'updated_media_data.json.gz'
-with gzip.open(output_file, 'wt', encoding='utf-8') as f:
-    json.dump(data, f, indent=2)
+# json.dump streams the encoded chunks into the gzip stream; compact separators keep the file small.
+with gzip.open(output_file, 'wt', encoding='utf-8', compresslevel=6) as f:
+    json.dump(data, f, separators=(',', ':'))
 
 # === Print Summary ===
 print("\n📊 Summary of Website Response Codes:")
@@ -61,5 +153,7 @@ for code, count in sorted(status_counter.items(), key=lambda x: (x[0] is None, x
     label = "None (Failed)" if code is None else str(code)
     print(f"{label}: {count} websites")
 
+print(f"\n🔌 HTTP connections: {client.summary()}")
+print(f"\n🔁 Checked {len(to_check)} of {len(outlets_by_website)} websites; the rest were fresh in {args.status_cache}")
 print(f"\n✅ Updated data saved to: {output_file}")
 print("⚠️  Failed URLs logged to: failed_websites.log")
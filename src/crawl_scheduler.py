@@ -0,0 +1,92 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+
+def available_memory_mb():
+    """Return MemAvailable from /proc/meminfo in MB, or None where it is not available."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def load_per_cpu():
+    """Return the 1-minute load average divided by the CPU count, or None if unknown."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+
+class CrawlScheduler:
+    """Admit Browsertrix crawls while container, worker and host resource limits allow.
+
+    A crawl is admitted when fewer than `max_containers` crawls are running, the total
+    Browsertrix workers stay within `max_workers`, and the host has at least
+    `min_free_memory_mb` available with a load average per CPU below `max_load`.
+    The first crawl is always admitted so an undersized limit cannot stall the run.
+    """
+
+    def __init__(self, max_containers=1, max_workers=None, min_free_memory_mb=0, max_load=None, poll_interval=15):
+        self.max_containers = max(1, max_containers)
+        self.max_workers = max_workers
+        self.min_free_memory_mb = min_free_memory_mb
+        self.max_load = max_load
+        self.poll_interval = poll_interval
+        self.running = 0
+        self.running_workers = 0
+        self._condition = threading.Condition()
+
+    def _blocked_reason(self, workers):
+        if self.running == 0:
+            return None
+        if self.running >= self.max_containers:
+            return f"{self.running} crawls running"
+        if self.max_workers and self.running_workers + workers > self.max_workers:
+            return f"{self.running_workers} workers in use"
+        if self.min_free_memory_mb:
+            free_mb = available_memory_mb()
+            if free_mb is not None and free_mb < self.min_free_memory_mb:
+                return f"only {free_mb:.0f} MB memory available"
+        if self.max_load:
+            load = load_per_cpu()
+            if load is not None and load > self.max_load:
+                return f"load per CPU is {load:.2f}"
+        return None
+
+    def acquire(self, workers):
+        """Block until a crawl with the given number of workers may start."""
+        with self._condition:
+            logged = False
+            while True:
+                reason = self._blocked_reason(workers)
+                if reason is None:
+                    break
+                if not logged:
+                    logging.info(f"Waiting to start crawl: {reason}")
+                    logged = True
+                # Resource checks are re-evaluated periodically, not only when a crawl ends.
+                self._condition.wait(self.poll_interval)
+            self.running += 1
+            self.running_workers += workers
+
+    def release(self, workers):
+        """Mark a crawl as finished and wake up waiting crawls."""
+        with self._condition:
+            self.running -= 1
+            self.running_workers -= workers
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, workers):
+        self.acquire(workers)
+        try:
+            yield
+        finally:
+            self.release(workers)
@@ -0,0 +1,99 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+def percentile(values, pct):
+    """Return the nearest-rank percentile of a non-empty list of numbers."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def read_page_urls(pages_file):
+    """Return the URLs of the pages Browsertrix recorded in a pages.jsonl file."""
+    urls = []
+    if not os.path.exists(pages_file):
+        return urls
+    with open(pages_file, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            try:
+                page = json.loads(line)
+            except ValueError:
+                continue
+            # The first line is a format header without a url.
+            url = page.get("url") if isinstance(page, dict) else None
+            if url:
+                urls.append(url)
+    return urls
+
+
+class CrawlStatsStore:
+    """Persistent history of Browsertrix crawl durations and captured pages.
+
+    Each state crawl is stored with its seed count, captured pages, duration and worker
+    count, plus seeds and captured pages per host. `predict_time_limit` turns the
+    recent history of a state into a --timeLimit for the next crawl.
+    """
+
+    def __init__(self, path, history_runs=30):
+        self.path = path
+        self.history_runs = history_runs
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS state_runs ("
+            "state TEXT, run_at REAL, seeds INTEGER, pages INTEGER, duration REAL, workers INTEGER, time_limit REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS state_runs_state ON state_runs (state, run_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS host_runs (host TEXT, state TEXT, run_at REAL, seeds INTEGER, pages INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS host_runs_host ON host_runs (host, run_at)")
+        self._conn.commit()
+
+    def record_run(self, state, seed_urls, pages_by_host, duration, workers, time_limit):
+        """Store the outcome of one state crawl."""
+        now = time.time()
+        seeds_by_host = Counter(urlsplit(url).hostname or "" for url in seed_urls)
+        hosts = set(seeds_by_host) | set(pages_by_host)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO state_runs (state, run_at, seeds, pages, duration, workers, time_limit) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (state, now, len(seed_urls), sum(pages_by_host.values()), duration, workers, time_limit)
+            )
+            self._conn.executemany(
+                "INSERT INTO host_runs (host, state, run_at, seeds, pages) VALUES (?, ?, ?, ?, ?)",
+                ((host, state, now, seeds_by_host.get(host, 0), pages_by_host.get(host, 0)) for host in hosts)
+            )
+            self._conn.commit()
+
+    def seconds_per_page(self, state):
+        """Return worker-seconds per captured page for the recent crawls of a state."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT duration, workers, pages FROM state_runs WHERE state = ? AND pages > 0 "
+                "ORDER BY run_at DESC LIMIT ?",
+                (state, self.history_runs)
+            ).fetchall()
+        return [duration * workers / pages for duration, workers, pages in rows]
+
+    def predict_time_limit(self, state, num_seed_urls, workers, pct=90, margin=1.2, min_runs=3):
+        """Predict a --timeLimit in seconds, or None when the state has too little history.
+
+        Uses the pct-th percentile of worker-seconds per captured page. Crawls cut short
+        by their time limit capture fewer pages and so raise the estimate next time.
+        """
+        samples = self.seconds_per_page(state)
+        if len(samples) < min_runs:
+            return None
+        return math.ceil(percentile(samples, pct) * num_seed_urls / workers * margin)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -12,6 +12,9 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse, unquote, urlsplit, urlunparse, quote, parse_qsl, urlencode
 from storysniffer import StorySniffer
 from internetarchive import upload
+from politeness import HostRateLimiter
+from http_client import HEADERS, HttpClient
+from feed_reader import feed_response_headers
 
 def setup_logger(log_file, log_level):
     logging.basicConfig(
@@ -39,11 +42,15 @@ def get_arguments():
     parser.add_argument("--tmp_directory", default="tmp", help="Directory to temporarily collect warcz files")
     parser.add_argument("--start", type=int, default=0, help="Start index of states to process")
     parser.add_argument("--end", type=int, default=None, help="End index (exclusive) of states to process")
+    parser.add_argument("--host_rate", type=float, default=1.0, help="Requests per second allowed to a single host during discovery (0 disables)")
+    parser.add_argument("--host_burst", type=int, default=3, help="Requests a host may receive back to back before --host_rate applies")
     return parser.parse_args()
 
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36'
-}
+# Shared per-host politeness limiter for discovery requests
+HOST_LIMITER = HostRateLimiter()
+
+# Pooled keep-alive HTTP client shared by all discovery requests
+HTTP_CLIENT = HttpClient(HEADERS)
 
 
 def is_valid_url(url):
@@ -64,7 +71,8 @@ def normalize_rss_url(url):
 
 def get_expanded_url(short_url):
     try:
-        response = requests.head(short_url, allow_redirects=True, timeout=5)
+        HOST_LIMITER.acquire(short_url)
+        response = HTTP_CLIENT.head(short_url, allow_redirects=True, timeout=5)
         return response.url
     except requests.RequestException as e:
         logging.error(f"Error resolving URL: {short_url}: {e}")
@@ -184,7 +192,14 @@ def process_publication(state, publication, timestamp, args, sniffer):
     seed_urls = []
 
     for rss_feed_url in publication.get("rss", []):
-        feed = feedparser.parse(normalize_rss_url(rss_feed_url))
+        feed_url = normalize_rss_url(rss_feed_url)
+        HOST_LIMITER.acquire(feed_url)
+        try:
+            response = HTTP_CLIENT.get(feed_url)
+        except requests.RequestException as e:
+            logging.error(f"Failed to fetch feed {feed_url}: {e}")
+            continue
+        feed = feedparser.parse(response.content, response_headers=feed_response_headers(response.headers, response.url))
         for entry in feed.entries:
             article_url = entry.link
             if article_url and sniffer.guess(article_url):
@@ -192,13 +207,13 @@ def process_publication(state, publication, timestamp, args, sniffer):
                 logging.info(f"RSS article found: {article_url}")
                 if len(seed_urls) >= args.max_articles:
                     break
-                time.sleep(5)
         if len(seed_urls) >= args.max_articles:
             break
 
     if len(seed_urls) < args.max_articles:
         try:
-            response = requests.get(website_url, headers=HEADERS, timeout=10)
+            HOST_LIMITER.acquire(website_url)
+            response = HTTP_CLIENT.get(website_url)
             response.raise_for_status()
             for article_url in extract_article_urls_from_html(response.text, website_url):
                 if article_url and sniffer.guess(article_url):
@@ -206,7 +221,6 @@ def process_publication(state, publication, timestamp, args, sniffer):
                     logging.info(f"Scraped article: {article_url}")
                     if len(seed_urls) >= args.max_articles:
                         break
-                    time.sleep(5)
         except requests.RequestException as e:
             logging.error(f"Failed to scrape {website_url}: {e}")
 
@@ -221,6 +235,7 @@ def main():
     args = get_arguments()
     setup_logger(args.log, args.log_level)
     sniffer = StorySniffer()
+    HOST_LIMITER.configure(args.host_rate, args.host_burst)
 
     logging.info("Starting news archiving process...")
 
@@ -246,6 +261,7 @@ def main():
         except Exception as e:
             logging.error(f"Fatal error: {e}")
 
+        HTTP_CLIENT.log_stats()
         logging.info(f"Sleeping for {args.sleep} seconds before next iteration...")
         time.sleep(args.sleep)
 
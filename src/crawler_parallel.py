@@ -8,10 +8,15 @@ import datetime
 import requests
 import subprocess
 import time
+import socket
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse, unquote, urlsplit, urlunparse, quote, parse_qsl, urlencode
 from storysniffer import StorySniffer
 from internetarchive import upload
+from politeness import HostRateLimiter
+from http_client import HEADERS, HttpClient
+from feed_reader import feed_response_headers
+from work_queue import LeaseQueue
 
 def setup_logger(log_file, log_level):
     logging.basicConfig(
@@ -38,11 +43,21 @@ def get_arguments():
     parser.add_argument("--tmp_directory", default="tmp", help="Directory to temporarily collect warcz files")
     parser.add_argument("--start_state", type=int, default=0, help="Start index of states to process")
     parser.add_argument("--end_state", type=int, default=None, help="End index (exclusive) of states to process")
+    parser.add_argument("--host_rate", type=float, default=1.0, help="Requests per second allowed to a single host during discovery (0 disables)")
+    parser.add_argument("--host_burst", type=int, default=3, help="Requests a host may receive back to back before --host_rate applies")
+    parser.add_argument("--work_queue", default=None, help="SQLite work queue on a shared filesystem; nodes lease publications from it instead of using SLURM chunks")
+    parser.add_argument("--node_id", default=f"{socket.gethostname()}-{os.getpid()}", help="Name this node uses to lease work")
+    parser.add_argument("--work_round", default=None, help="Round of work to join (default: the current UTC date)")
+    parser.add_argument("--lease_seconds", type=int, default=900, help="Seconds a leased publication stays reserved without renewal")
+    parser.add_argument("--claim_batch", type=int, default=5, help="Number of publications leased at a time")
+    parser.add_argument("--max_attempts", type=int, default=3, help="Leases of one publication before it is given up on")
     return parser.parse_args()
 
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36'
-}
+# Shared per-host politeness limiter for discovery requests
+HOST_LIMITER = HostRateLimiter()
+
+# Pooled keep-alive HTTP client shared by all discovery requests
+HTTP_CLIENT = HttpClient(HEADERS)
 
 
 def is_valid_url(url):
@@ -63,7 +78,8 @@ def normalize_rss_url(url):
 
 def get_expanded_url(short_url):
     try:
-        response = requests.head(short_url, allow_redirects=True, timeout=5)
+        HOST_LIMITER.acquire(short_url)
+        response = HTTP_CLIENT.head(short_url, allow_redirects=True, timeout=5)
         return response.url
     except requests.RequestException as e:
         logging.error(f"Error resolving URL: {short_url}: {e}")
@@ -182,7 +198,14 @@ def process_publication(state, publication, timestamp, args, sniffer):
     seed_urls = []
 
     for rss_feed_url in publication.get("rss", []):
-        feed = feedparser.parse(normalize_rss_url(rss_feed_url))
+        feed_url = normalize_rss_url(rss_feed_url)
+        HOST_LIMITER.acquire(feed_url)
+        try:
+            response = HTTP_CLIENT.get(feed_url)
+        except requests.RequestException as e:
+            logging.error(f"Failed to fetch feed {feed_url}: {e}")
+            continue
+        feed = feedparser.parse(response.content, response_headers=feed_response_headers(response.headers, response.url))
         for entry in feed.entries:
             article_url = entry.link
             if article_url and sniffer.guess(article_url):
@@ -190,13 +213,13 @@ def process_publication(state, publication, timestamp, args, sniffer):
                 logging.info(f"RSS article found: {article_url}")
                 if len(seed_urls) >= args.max_articles:
                     break
-                time.sleep(5)
         if len(seed_urls) >= args.max_articles:
             break
 
     if len(seed_urls) < args.max_articles:
         try:
-            response = requests.get(website_url, headers=HEADERS, timeout=10)
+            HOST_LIMITER.acquire(website_url)
+            response = HTTP_CLIENT.get(website_url)
             response.raise_for_status()
             for article_url in extract_article_urls_from_html(response.text, website_url):
                 if article_url and sniffer.guess(article_url):
@@ -204,7 +227,6 @@ def process_publication(state, publication, timestamp, args, sniffer):
                     logging.info(f"Scraped article: {article_url}")
                     if len(seed_urls) >= args.max_articles:
                         break
-                    time.sleep(5)
         except requests.RequestException as e:
             logging.error(f"Failed to scrape {website_url}: {e}")
 
@@ -215,10 +237,54 @@ def process_publication(state, publication, timestamp, args, sniffer):
         logging.warning(f"No valid URLs for {website_url}")
 
 
+def crawlable_publications(data, selected_states):
+    """Return (state, publication) pairs whose website responded with 2xx/3xx."""
+    return [
+        (state, publication)
+        for state in selected_states
+        for news_media in ['newspaper', 'tv', 'radio', 'broadcast']
+        for publication in data[state].get(news_media, [])
+        if publication.get("website_status_code") in range(200, 400)
+    ]
+
+
+def run_leased(work_queue, all_publications, args, sniffer):
+    """Process publications leased from the shared work queue until the round is drained."""
+    round_id = args.work_round or datetime.datetime.utcnow().strftime('%Y-%m-%d')
+    work_queue.populate(round_id, (
+        (f"{state}|{publication.get('website')}", {"state": state, "publication": publication})
+        for state, publication in all_publications
+    ))
+    logging.info(f"Joined work round {round_id} as {args.node_id}: {work_queue.counts(round_id)}")
+
+    processed = 0
+    while True:
+        batch = work_queue.claim(round_id, args.claim_batch)
+        if not batch:
+            break
+        for task_id, task in batch:
+            try:
+                timestamp = datetime.datetime.now(datetime.timezone.utc)
+                process_publication(task["state"], task["publication"], timestamp, args, sniffer)
+                work_queue.complete(task_id)
+                processed += 1
+            except Exception as e:
+                logging.error(f"Error processing {task['publication'].get('website')}: {e}")
+                work_queue.release(task_id)
+    logging.info(f"Processed {processed} publications in round {round_id}: {work_queue.counts(round_id)}")
+    return round_id
+
+
 def main():
     args = get_arguments()
     setup_logger(args.log, args.log_level)
     sniffer = StorySniffer()
+    HOST_LIMITER.configure(args.host_rate, args.host_burst)
+
+    work_queue = None
+    if args.work_queue:
+        work_queue = LeaseQueue(args.work_queue, args.node_id, args.lease_seconds, args.max_attempts)
+        work_queue.start_renewing()
 
     logging.info("Starting news archiving process...")
 
@@ -227,26 +293,28 @@ def main():
             with open(args.input, "r") as f:
                 data = json.load(f)
 
-            task_id = int(os.environ.get("SLURM_ARRAY_TASK_ID", 0))
-            chunk_size = int(os.environ.get("CHUNK_SIZE", 100))
-            start = task_id * chunk_size
-            end = start + chunk_size
-
             states = list(data.keys())
             start_state = args.start_state
-            end_state = args.end_state if args.end is not None else len(states)
+            end_state = args.end_state if args.end_state is not None else len(states)
             selected_states = states[start_state:end_state]
 
-            all_publications = []
-            for state in selected_states:
-                logging.info(f"Processing state: {state}")
-                publications = data[state]
-                for news_media in ['newspaper', 'tv', 'radio', 'broadcast']:
-                    for publication in publications.get(news_media, []):
-                        if publication.get("website_status_code") in range(200, 400):
-                            all_publications.append((state, publication))
-                            timestamp = datetime.datetime.now(datetime.timezone.utc)
-                            process_publication(state, publication, timestamp, args, sniffer)
+            all_publications = crawlable_publications(data, selected_states)
+
+            if work_queue:
+                round_id = run_leased(work_queue, all_publications, args, sniffer)
+                HTTP_CLIENT.log_stats()
+                leased = work_queue.counts(round_id).get("leased", 0)
+                if args.work_round and not leased:
+                    break
+                # Tasks leased by other nodes come back if those nodes die, so keep polling
+                # while any are outstanding; a new round starts with the next UTC day.
+                time.sleep(min(60, args.lease_seconds) if leased else 300)
+                continue
+
+            task_id = int(os.environ.get("SLURM_ARRAY_TASK_ID", 0))
+            chunk_size = int(os.environ.get("CHUNK_SIZE", 100))
+            start = task_id * chunk_size
+            end = start + chunk_size
 
             selected_chunk = all_publications[start:end]
             logging.info(f"Total flattened publications: {len(all_publications)}")
@@ -257,9 +325,13 @@ def main():
                 if publication.get("website_status_code") in range(200, 400):
                     timestamp = datetime.datetime.now(datetime.timezone.utc)
                     process_publication(state, publication, timestamp, args, sniffer)
+            HTTP_CLIENT.log_stats()
 
         except Exception as e:
             logging.error(f"Fatal error: {e}")
 
+    if work_queue:
+        work_queue.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,18 +3,38 @@ import logging
 import json
 import os
 import shutil
-import feedparser
 import datetime
 import requests
 import subprocess
 import time
 import internetarchive
 import concurrent.futures
-from bs4 import BeautifulSoup
+import asyncio
+import queue
+from collections import Counter, deque
+from contextlib import closing
 from urllib.parse import urljoin, urlparse, unquote, urlsplit, urlunparse, quote, parse_qsl, urlencode
-from storysniffer import StorySniffer
+from story_classifier import BatchStorySniffer
 from internetarchive import upload
-from threading import Thread
+from threading import Thread, Event
+from politeness import HostRateLimiter, interleave_by_host
+from feed_cache import FeedCache
+from seen_index import SeenArticleIndex
+from redirect_cache import RedirectCache
+from link_extractor import iter_links
+from crawl_scheduler import CrawlScheduler
+from crawl_stats import CrawlStatsStore, read_page_urls
+from metrics import Metrics
+from upload_scheduler import UploadScheduler
+from upload_journal import UploadJournal, MISSING
+from resumable_upload import ResumableUploader
+from segment_watcher import SegmentWatcher
+from publication_index import PublicationIndex, MEDIA_TYPES
+from url_canonicalizer import canonicalize_url, dedupe_urls
+from sitemap_discovery import SitemapDiscovery
+from parse_pool import ParsePool
+from feed_reader import CHUNK_SIZE, feed_response_headers, iter_body_chunks, iter_feed_entries
+from http_client import HEADERS, HttpClient
 
 def setup_logger(log_file, log_level):
     """Configure logging to output to both file and console."""
@@ -27,8 +47,44 @@ def setup_logger(log_file, log_level):
         ]
     )
 
-# Global upload thread pool
-UPLOAD_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=5)
+# Single upload queue shared by WARC and WACZ uploads, limits configured in main()
+UPLOAD_SCHEDULER = UploadScheduler()
+
+# Journal of queued, in-flight and finished uploads, opened in main()
+UPLOAD_JOURNAL = None
+
+# Retrying, resumable uploader used for WARC.GZ files, created in main()
+UPLOADER = None
+
+# Shared per-host politeness limiter for discovery requests
+HOST_LIMITER = HostRateLimiter()
+
+# Pooled keep-alive HTTP client shared by all threaded discovery requests
+HTTP_CLIENT = HttpClient(HEADERS)
+
+# Persistent conditional-GET feed cache, opened in main() unless disabled
+FEED_CACHE = None
+
+# Persistent index of already-archived article URLs, opened in main() unless disabled
+SEEN_INDEX = None
+
+# Persistent TTL cache of resolved homepage URLs, opened in main() unless disabled
+REDIRECT_CACHE = None
+
+# Sitemap-based article discovery with a per-host robots.txt cache, opened in main() unless disabled
+SITEMAPS = None
+
+# Process pool for feed and homepage parsing, created in main() when --parse_workers is set
+PARSE_POOL = None
+
+# Admission control for Browsertrix containers, configured in main()
+CRAWL_SCHEDULER = CrawlScheduler()
+
+# Persistent history of crawl durations used to predict time limits, opened in main() unless disabled
+CRAWL_STATS = None
+
+# Per-stage latency, byte and error metrics, outputs configured in main()
+METRICS = Metrics()
 
 
 def get_arguments():
@@ -55,11 +111,48 @@ def get_arguments():
     parser.add_argument('--workers', type=int, default=10, help='Number of workers for crawling per run')
     parser.add_argument("--delete_uploaded_warc", type=bool, default=True, help="Delete the .warc file after successful upload to Internet Archive")
     parser.add_argument("--rolloverSize", type=int, default=10000000000, help="Declare the rollover size")
+    parser.add_argument("--discovery_engine", "--discovery-engine", dest="discovery_engine", choices=["threads", "async"], default="threads", help="Seed discovery engine: thread pool or asyncio")
+    parser.add_argument("--async_concurrency", type=int, default=200, help="Maximum in-flight requests for the async discovery engine")
+    parser.add_argument("--async_per_host", type=int, default=4, help="Maximum concurrent connections per host for the async discovery engine")
+    parser.add_argument("--host_rate", type=float, default=1.0, help="Requests per second allowed to a single host during discovery (0 disables)")
+    parser.add_argument("--host_burst", type=int, default=8, help="Requests a host may receive back to back before --host_rate applies; sized so a typical publication's feed, robots.txt, sitemaps and homepage fit")
+    parser.add_argument("--feed_cache", default="feed_cache.sqlite3", help="Path to the persistent RSS feed cache (empty string disables it)")
+    parser.add_argument("--feed_cache_size", type=int, default=20000, help="Maximum number of feeds kept in the feed cache")
+    parser.add_argument("--seen_index", default="seen_articles.sqlite3", help="Path to the index of already-archived article URLs (empty string disables it)")
+    parser.add_argument("--seen_window_days", type=int, default=30, help="Days an archived article URL is skipped before it may be seeded again")
+    parser.add_argument("--sniffer_cache", default="sniffer_cache.json.gz", help="Path to the persisted StorySniffer verdict cache (empty string disables persistence)")
+    parser.add_argument("--sniffer_cache_size", type=int, default=200000, help="Maximum number of URL verdicts kept in the sniffer cache")
+    parser.add_argument("--sniff_batch_size", type=int, default=64, help="Number of candidate URLs classified per StorySniffer batch")
+    parser.add_argument("--redirect_cache", default="redirect_cache.sqlite3", help="Path to the persistent cache of resolved homepage URLs (empty string disables it)")
+    parser.add_argument("--redirect_cache_ttl_days", type=int, default=7, help="Days a resolved homepage URL is reused before it is resolved again")
+    parser.add_argument("--sitemap_cache", default="sitemap_cache.sqlite3", help="Path to the per-host cache of robots.txt sitemaps (empty string disables sitemap discovery)")
+    parser.add_argument("--sitemap_cache_ttl_days", type=int, default=7, help="Days a host's robots.txt sitemap list is reused")
+    parser.add_argument("--parse_workers", type=int, default=0, help="Processes that parse feeds and homepages while downloads stay on threads (0 parses in the discovery threads)")
+    parser.add_argument("--parse_chunk_size", type=int, default=200, help="Homepage links in the first parse-worker task; the limit doubles when discovery needs more")
+    parser.add_argument("--pipeline", action="store_true", help="Discover seeds for upcoming states while the current state is being archived")
+    parser.add_argument("--pipeline_depth", type=int, default=1, help="Number of discovered states allowed to wait for archiving in pipeline mode")
+    parser.add_argument("--max_concurrent_crawls", type=int, default=1, help="Maximum number of Browsertrix containers running at once")
+    parser.add_argument("--max_total_workers", type=int, default=None, help="Maximum Browsertrix workers across all running containers")
+    parser.add_argument("--crawl_min_free_memory_mb", type=int, default=0, help="Do not start another crawl while less memory than this is available (0 disables)")
+    parser.add_argument("--crawl_max_load", type=float, default=None, help="Do not start another crawl while the load average per CPU is above this")
+    parser.add_argument("--crawl_stats", default="crawl_stats.sqlite3", help="Path to the persistent crawl duration history (empty string disables adaptive time limits)")
+    parser.add_argument("--time_limit_percentile", type=float, default=90, help="Percentile of past seconds per page used to predict a state's time limit")
+    parser.add_argument("--time_limit_margin", type=float, default=1.2, help="Multiplier applied to the predicted time limit")
+    parser.add_argument("--time_limit_min_runs", type=int, default=3, help="Past crawls of a state needed before its time limit is predicted")
+    parser.add_argument("--upload_concurrency", type=int, default=5, help="Maximum number of files uploaded to Internet Archive at once")
+    parser.add_argument("--upload_bandwidth", type=int, default=0, help="Combined upload bandwidth cap in bytes per second (0 means unlimited)")
+    parser.add_argument("--max_pending_upload_bytes", type=int, default=100000000000, help="Pause discovery and crawling while more than this many bytes wait to be uploaded (0 disables)")
+    parser.add_argument("--upload_journal", default="upload_journal.sqlite3", help="Path to the persistent upload journal used to resume interrupted uploads")
+    parser.add_argument("--upload_endpoint", default="https://s3.us.archive.org", help="S3-compatible endpoint WARC.GZ files are uploaded to")
+    parser.add_argument("--upload_retries", type=int, default=5, help="Retries with exponential backoff for each failed upload request")
+    parser.add_argument("--multipart_threshold", type=int, default=500000000, help="Files of at least this many bytes are uploaded in parts")
+    parser.add_argument("--multipart_part_size", type=int, default=100000000, help="Part size in bytes for multipart uploads")
+    parser.add_argument("--segment_poll_interval", type=int, default=30, help="Seconds between checks for rolled-over WARC segments to upload during a crawl (0 waits for the crawl to finish)")
+    parser.add_argument("--publication_index", default="publication_index.pickle", help="Path of the compiled publication index rebuilt when --input changes (empty string keeps it in memory only)")
+    parser.add_argument("--metrics_jsonl", default="metrics.jsonl", help="Path of the JSONL per-stage metrics event log (empty string disables it)")
+    parser.add_argument("--metrics_prom", default="crawler_metrics.prom", help="Path of the Prometheus textfile-collector metrics file (empty string disables it)")
     return parser.parse_args()
 
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36'
-}
 
 
 def is_valid_url(url):
@@ -72,160 +165,271 @@ def is_valid_url(url):
         return False
 
 
-def normalize_rss_url(url):
-    """Ensure RSS feed uses HTTPS and encode its query parameters."""
-    parsed = urlparse(url)
-    scheme = "https"
-    encoded_query = urlencode(parse_qsl(parsed.query, keep_blank_values=True), doseq=True)
-    return urlunparse((scheme, parsed.netloc, parsed.path, parsed.params, encoded_query, parsed.fragment)).replace("&", "&amp;")
-
-
 def get_expanded_url(short_url):
-    """Follow redirects to expand short URLs."""
+    """Follow redirects to expand short URLs, reusing cached resolutions."""
+    if REDIRECT_CACHE:
+        resolved = REDIRECT_CACHE.get(short_url)
+        if resolved:
+            return resolved
     try:
-        response = requests.head(short_url, allow_redirects=True, timeout=5)
+        HOST_LIMITER.acquire(short_url)
+        response = HTTP_CLIENT.head(short_url, allow_redirects=True, timeout=5)
+        if REDIRECT_CACHE:
+            REDIRECT_CACHE.put(short_url, response.url)
         return response.url
     except requests.RequestException as e:
         logging.error(f"Error resolving URL: {short_url}: {e}")
         return short_url
 
 
-def extract_article_urls_from_html(html_content, base_url):
-    """Extract article URLs from HTML using BeautifulSoup."""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    resolved_base = get_expanded_url(base_url)
-    return {
-        urljoin(resolved_base, link['href'])
-        for link in soup.find_all("a", href=True)
-    }
+def homepage_request_url(website_url):
+    """Return the URL to GET for a homepage, skipping redirects we already know about."""
+    if REDIRECT_CACHE:
+        return REDIRECT_CACHE.get(website_url) or website_url
+    return website_url
+
+
+def record_homepage_redirect(website_url, final_url):
+    """Remember where a homepage GET ended up after following redirects."""
+    if REDIRECT_CACHE:
+        REDIRECT_CACHE.put(website_url, final_url)
+
+
+def fetch_feed_for_pool(feed_url, cached):
+    """Download a feed on this thread and parse it in the parse pool."""
+    request_headers = FEED_CACHE.conditional_headers(cached) if FEED_CACHE else {}
+
+    HOST_LIMITER.acquire(feed_url)
+    try:
+        with METRICS.timer("feed_fetch") as event:
+            response = HTTP_CLIENT.get(feed_url, headers=request_headers)
+            event.labels["status"] = response.status_code
+            event.bytes = len(response.content)
+    except requests.RequestException as e:
+        logging.error(f"Failed to fetch feed {feed_url}: {e}")
+        return []
+
+    if cached and response.status_code == 304:
+        FEED_CACHE.hit(feed_url)
+        return replay_cached_feed(feed_url, cached)
+
+    response_headers = feed_response_headers(response.headers, response.url)
+    entries = PARSE_POOL.parse_feed(response.content, response_headers)
+    if FEED_CACHE and response.status_code == 200:
+        FEED_CACHE.store(feed_url, response.headers.get('ETag'), response.headers.get('Last-Modified'), entries)
+    return entries
+
+
+def read_feed_entries(feed_url, chunks, status, response_headers, skip=0):
+    """Yield entries parsed from a feed body's chunks, skipping the first skip entries.
+
+    Once the caller stops iterating, the entries read so far are stored in the feed
+    cache, marked incomplete if the end of the feed was not reached.
+    """
+    entries = []
+    complete = False
+    try:
+        for entry in iter_feed_entries(chunks, response_headers):
+            entries.append(entry)
+            if len(entries) > skip:
+                yield entry
+        complete = True
+    finally:
+        if FEED_CACHE and status == 200:
+            FEED_CACHE.store(feed_url, response_headers.get('ETag'), response_headers.get('Last-Modified'), entries, complete)
+
+
+def replay_cached_feed(feed_url, cached):
+    """Yield a feed's cached entries after a 304, then fetch the rest if the cached list stopped short."""
+    yield from cached[2]
+    if not cached[3]:
+        # Discovery stopped reading this feed early last time; the later entries were never cached.
+        yield from stream_feed(feed_url, skip=len(cached[2]))
+
+
+def stream_feed(feed_url, cached=None, skip=0):
+    """Yield a feed's entries while it downloads; reading stops when the caller stops iterating.
+
+    With a lookup() result from the feed cache the request is conditional and a 304
+    replays the cached entries instead.
+    """
+    request_headers = FEED_CACHE.conditional_headers(cached) if FEED_CACHE else {}
+
+    HOST_LIMITER.acquire(feed_url)
+    try:
+        with METRICS.timer("feed_fetch") as event:
+            response = HTTP_CLIENT.get(feed_url, headers=request_headers, stream=True)
+            event.labels["status"] = response.status_code
+    except requests.RequestException as e:
+        logging.error(f"Failed to fetch feed {feed_url}: {e}")
+        return
+
+    if cached and response.status_code == 304:
+        response.close()
+        FEED_CACHE.hit(feed_url)
+        yield from replay_cached_feed(feed_url, cached)
+        return
+
+    response_headers = feed_response_headers(response.headers, response.url)
+    try:
+        with response:
+            chunks = response.iter_content(CHUNK_SIZE)
+            yield from METRICS.timed_iter("feed_parse", read_feed_entries(feed_url, chunks, response.status_code, response_headers, skip))
+    except requests.RequestException as e:
+        logging.error(f"Failed to read feed {feed_url}: {e}")
+
+
+def fetch_feed(feed_url):
+    """Yield a feed's entries, revalidating against the feed cache when possible."""
+    cached = FEED_CACHE.lookup(feed_url) if FEED_CACHE else None
+    if PARSE_POOL:
+        yield from fetch_feed_for_pool(feed_url, cached)
+    else:
+        yield from stream_feed(feed_url, cached)
+
+
+def select_feed_story_urls(entries, sniffer, seed_urls, args):
+    """Offer a feed's entry links to select_story_urls, then close the feed so reading stops."""
+    with closing(entries):
+        select_story_urls((entry["link"] for entry in entries), sniffer, seed_urls, args.max_articles, "RSS article found", args.sniff_batch_size)
+
+
+def extract_article_urls_from_html(html_content, base_url, resolved_base=None):
+    """Lazily yield unique article URLs from HTML in document order.
+
+    Parsing advances only as far as the caller iterates, so discovery can stop as soon
+    as it has accepted max_articles story URLs.
+    """
+    if resolved_base is None:
+        resolved_base = get_expanded_url(base_url)
+    if PARSE_POOL:
+        return METRICS.timed_iter("link_extraction", PARSE_POOL.iter_links(html_content, resolved_base))
+    return METRICS.timed_iter("link_extraction", iter_links(html_content, resolved_base))
+
+
+def move_into(src_file, directory):
+    """Move a file into directory under a temporary name, then rename it into place.
+
+    Other crawls share the collection directory, so a .warc.gz name only appears
+    once the file is complete. Returns the final path.
+    """
+    dest_path = os.path.join(directory, os.path.basename(src_file))
+    tmp_path = f"{dest_path}.part"
+    shutil.move(src_file, tmp_path)
+    os.replace(tmp_path, dest_path)
+    return dest_path
 
 
 def move_warc(directory, archive_file_name, tmp_directory):
-    """Move generated WARC.GZ files to final collection directory."""
+    """Move generated WARC.GZ files to final collection directory.
+
+    Returns the paths of the moved files.
+    """
+    moved = []
     try:
         logging.info(f"Started moving WARC.GZ files for {archive_file_name}")
         os.makedirs(directory, exist_ok=True)
         source_dir = os.path.join(tmp_directory, 'collections', archive_file_name)
         if not os.path.exists(source_dir):
             logging.warning(f"Source directory not found: {source_dir}")
-            return
-
-        for file_name in os.listdir(source_dir):
-            if file_name.endswith(".warc.gz"):
-                src_file = os.path.join(source_dir, file_name)
-                shutil.move(src_file, directory)
-                logging.info(f"Moved: {file_name} to {directory}")
+            return moved
+
+        with METRICS.timer("move_warc", archive=archive_file_name) as event:
+            for file_name in os.listdir(source_dir):
+                if file_name.endswith(".warc.gz"):
+                    src_file = os.path.join(source_dir, file_name)
+                    event.bytes += os.path.getsize(src_file)
+                    moved.append(move_into(src_file, directory))
+                    logging.info(f"Moved: {file_name} to {directory}")
     except Exception as e:
         logging.error(f"Error moving WARC.GZ files for {archive_file_name}: {e}")
+    return moved
 
 
-# def upload_warc(directory, archive_file_name, item_identifier, args):
-#     """Upload all WARC.GZ files to Internet Archive if enabled."""
-#     if not args.upload_warc:
-#         return
-
-#     try:
-#         for file_name in os.listdir(directory):
-#             if file_name.endswith(".warc.gz"):
-#                 src_file = os.path.join(directory, file_name)
-#                 logging.info(f'Uploading to Internet Archive: {item_identifier}/{file_name}')
-#                 upload(
-#                     item_identifier,
-#                     files={file_name: src_file},
-#                     metadata={
-#                         'collection': args.collection,
-#                         'uploader': args.uploader,
-#                         'mediatype': args.mediatype
-#                     },
-#                     queue_derive=False,
-#                     verbose=True
-#                 )
-#                 logging.info(f'Successfully uploaded: {item_identifier}/{file_name}')
-
-#                 if args.delete_uploaded_warc:
-#                     if os.path.exists(src_file):
-#                         os.remove(src_file)
-#                         logging.info(f"Deleted uploaded file: {src_file}")
-#                     else:
-#                         logging.warning(f"Could not find file to delete after upload: {src_file}")
-
-#     except Exception as e:
-#         logging.error(f"Error uploading WARC.GZ files for {archive_file_name}: {e}")
+def handoff_segment(segment_path, directory, archive_file_name, item_identifier, args):
+    """Move a finished WARC segment into the collection directory and queue its upload.
 
-import concurrent.futures
+    Returns the futures of the queued uploads.
+    """
+    file_name = os.path.basename(segment_path)
+    with METRICS.timer("move_warc", archive=archive_file_name) as event:
+        event.bytes = os.path.getsize(segment_path)
+        dest_path = move_into(segment_path, directory)
+    logging.info(f"Moved finished segment {file_name} to {directory} while crawling")
 
-def upload_warc(directory, archive_file_name, item_identifier, args):
-    """Upload all WARC.GZ files in parallel to Internet Archive if enabled."""
     if not args.upload_warc:
-        return
+        return []
+    future = UPLOAD_SCHEDULER.submit(dest_path, upload_single_file, dest_path, file_name, item_identifier, args)
+    return [future] if future is not None else []
 
-    def upload_single_file(file_path, file_name):
-        try:
-            logging.info(f'Uploading to Internet Archive: {item_identifier}/{file_name}')
-            upload(
-                item_identifier,
-                files={file_name: file_path},
-                metadata={
-                    'collection': args.collection,
-                    'uploader': args.uploader,
-                    'mediatype': args.mediatype
-                },
-                queue_derive=False,
-                verbose=True
-            )
-            logging.info(f'Successfully uploaded: {item_identifier}/{file_name}')
 
-            if args.delete_uploaded_warc:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    logging.info(f"Deleted uploaded file: {file_path}")
-                else:
-                    logging.warning(f"Could not find file to delete after upload: {file_path}")
+# def upload_warc(warc_paths, archive_file_name, item_identifier, args):
+    """Queue the WARC.GZ files returned by move_warc on the shared upload scheduler if enabled.
 
-        except Exception as e:
-            logging.error(f"Error uploading {file_name}: {e}")
+    Returns the futures of the queued uploads.
+    """
+    if not args.upload_warc:
+        return []
 
     try:
-        warc_files = [
-            file_name for file_name in os.listdir(directory)
-            if file_name.endswith(".warc.gz")
-        ]
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            for file_name in warc_files:
-                file_path = os.path.join(directory, file_name)
-                futures.append(executor.submit(upload_single_file, file_path, file_name))
-
-            # Optionally: Wait for all uploads to finish before returning
-            concurrent.futures.wait(futures)
+        futures = []
+        for file_path in warc_paths:
+            file_name = os.path.basename(file_path)
+            future = UPLOAD_SCHEDULER.submit(file_path, upload_single_file, file_path, file_name, item_identifier, args)
+            if future is not None:
+                futures.append(future)
+        return futures
 
     except Exception as e:
         logging.error(f"Error scheduling WARC.GZ uploads for {archive_file_name}: {e}")
+        return []
+
+
+def resume_uploads(args):
+    """Queue the journaled uploads that did not finish in an earlier run.
+
+    Returns the futures of the queued uploads.
+    """
+    if not args.upload_warc:
+        return []
+
+    futures = []
+    for file_path, item_identifier, file_name in UPLOAD_JOURNAL.unfinished():
+        if not os.path.exists(file_path):
+            logging.warning(f"Cannot resume upload of {item_identifier}/{file_name}: {file_path} no longer exists")
+            UPLOAD_JOURNAL.fail(file_path, "local file missing", status=MISSING)
+            continue
+        logging.info(f"Resuming upload of {item_identifier}/{file_name} from the upload journal")
+        future = UPLOAD_SCHEDULER.submit(file_path, upload_single_file, file_path, file_name, item_identifier, args)
+        if future is not None:
+            futures.append(future)
+    return futures
 
 
 def upload_wacz(directory, archive_file_name, item_identifier, args):
     """Schedule upload of WACZ file to Internet Archive in background."""
 
     if not args.upload_wacz:
-        return
+        return None
+
+    src_file = os.path.join(directory, f"{archive_file_name}.wacz")
 
     def _upload_task():
         try:
-            src_file = os.path.join(directory, f"{archive_file_name}.wacz")
             upload_dest_file = f"{archive_file_name}.wacz"
             logging.info(f'Uploading to Internet Archive: {item_identifier}/{upload_dest_file}')
-            r = upload(
-                item_identifier,
-                files={upload_dest_file: src_file},
-                metadata={
-                    'collection': args.collection,
-                    'uploader': args.uploader,
-                    'mediatype': args.mediatype
-                },
-                queue_derive=False,
-                verbose=True
-            )
+            with UPLOAD_SCHEDULER.open(src_file) as body:
+                r = upload(
+                    item_identifier,
+                    files={upload_dest_file: body},
+                    metadata={
+                        'collection': args.collection,
+                        'uploader': args.uploader,
+                        'mediatype': args.mediatype
+                    },
+                    queue_derive=False,
+                    verbose=True
+                )
             logging.info(f'Successfully uploaded: {item_identifier}/{upload_dest_file}')
 
             if args.delete_uploaded_wacz:
@@ -237,8 +441,8 @@ def upload_wacz(directory, archive_file_name, item_identifier, args):
         except Exception as e:
             logging.error(f"Error uploading {archive_file_name}: {e}")
 
-    # Submit to global background thread pool
-    UPLOAD_EXECUTOR.submit(_upload_task)
+    # Submit to the shared upload queue
+    return UPLOAD_SCHEDULER.submit(src_file, _upload_task)
 
 
 
@@ -267,11 +471,36 @@ def delete_warc_dir(archive_file_name, tmp_directory, args):
         logging.error(f"Cleanup failed for {archive_file_name}: {e}")
 
 
-def archive(seed_urls, archive_file_name, item_identifier, num_seed_urls, args, background_uploads):
-    """Run Browsertrix Crawler inside Docker to archive seed URLs."""
+def get_time_limit(state, num_seed_urls, args):
+    """Return the Browsertrix time limit for a state crawl.
+
+    --time_limit wins when given. Otherwise the limit is predicted from the state's crawl
+    history, falling back to --time_per_url for states without enough history.
+    """
+    if args.time_limit:
+        return args.time_limit
+
+    if CRAWL_STATS and state is not None:
+        predicted = CRAWL_STATS.predict_time_limit(
+            state, num_seed_urls, args.workers, args.time_limit_percentile, args.time_limit_margin, args.time_limit_min_runs
+        )
+        if predicted is not None:
+            logging.info(f"Predicted time limit for {state} from crawl history: {predicted}")
+            return predicted
+
+    return (args.time_per_url * num_seed_urls) / (args.workers)
+
+
+def archive(seed_urls, archive_file_name, item_identifier, num_seed_urls, args, background_uploads, state=None):
+    """Run Browsertrix Crawler inside Docker to archive seed URLs.
+
+    Returns the URLs of the pages the crawl captured, which is empty if it failed.
+    """
+    captured_urls = []
     try:
         directory = os.path.join(args.collection_directory, item_identifier)
-        tmp_directory = args.tmp_directory
+        # Each crawl gets its own tmp subdirectory so concurrent containers never share /crawls.
+        tmp_directory = os.path.join(args.tmp_directory, archive_file_name)
         os.makedirs(tmp_directory, exist_ok=True)
         os.makedirs(directory, exist_ok=True)
         seed_file_path = os.path.join(tmp_directory, f"{archive_file_name}.txt")
@@ -280,11 +509,8 @@ def archive(seed_urls, archive_file_name, item_identifier, num_seed_urls, args,
             for url in seed_urls:
                 f.write(f"{url}\n")
 
-        if args.time_limit:
-            timelimit = args.time_limit
-        else:
-            timelimit = (args.time_per_url * num_seed_urls) / (args.workers)
-        
+        timelimit = get_time_limit(state, num_seed_urls, args)
+
         logging.info(f"Timelimit for: {archive_file_name} is {timelimit}")
 
         command = (
@@ -296,23 +522,53 @@ def archive(seed_urls, archive_file_name, item_identifier, num_seed_urls, args,
 
         logging.info(f"Running archive subprocess: {command}")
 
-        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        watcher = None
+        if args.segment_poll_interval:
+            # Rolled-over segments are moved and uploaded while the crawl is still running.
+            source_dir = os.path.join(tmp_directory, 'collections', archive_file_name)
+            watcher = SegmentWatcher(
+                [source_dir, os.path.join(source_dir, 'archive')],
+                args.rolloverSize,
+                lambda path: background_uploads.extend(handoff_segment(path, directory, archive_file_name, item_identifier, args)),
+                args.segment_poll_interval
+            )
+            watcher.start()
+
+        crawl_start_time = time.time()
+        try:
+            process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+            for line in process.stdout:
+                logging.info(line.strip())
+            for line in process.stderr:
+                logging.error(line.strip())
+
+            process.wait()
+        finally:
+            if watcher:
+                watcher.stop()
+                logging.info(f"Handed off {watcher.handed_off} WARC segments of {archive_file_name} during the crawl")
+        crawl_duration = time.time() - crawl_start_time
+        METRICS.observe("docker_crawl", crawl_duration, error=process.returncode != 0, state=state, seeds=num_seed_urls, returncode=process.returncode)
 
-        for line in process.stdout:
-            logging.info(line.strip())
-        for line in process.stderr:
-            logging.error(line.strip())
+        pages_file = os.path.join(tmp_directory, 'collections', archive_file_name, 'pages', 'pages.jsonl')
+        captured_urls = read_page_urls(pages_file)
+        if process.returncode != 0:
+            logging.warning(f"Crawl of {archive_file_name} exited with code {process.returncode} after capturing {len(captured_urls)} pages")
 
-        process.wait()
+        if CRAWL_STATS and state is not None:
+            pages_by_host = Counter(urlsplit(url).hostname or "" for url in captured_urls)
+            CRAWL_STATS.record_run(state, seed_urls, pages_by_host, crawl_duration, args.workers, timelimit)
+            logging.info(f"Crawl of {state} captured {sum(pages_by_host.values())} of {num_seed_urls} seeds in {crawl_duration:.0f}s")
 
-        move_warc(directory, archive_file_name, tmp_directory)
+        warc_paths = move_warc(directory, archive_file_name, tmp_directory)
 
-        # Launch upload in background
-        upload_thread = Thread(target=upload_warc, args=(directory, archive_file_name, item_identifier, args))
-        upload_thread.start()
-        background_uploads.append(upload_thread)
+        # Queue uploads in the background; the scheduler bounds concurrency and bandwidth
+        background_uploads.extend(upload_warc(warc_paths, archive_file_name, item_identifier, args))
 
         delete_warc_dir(archive_file_name, tmp_directory, args)
+        if args.delete_warc:
+            shutil.rmtree(tmp_directory, ignore_errors=True)
 
         # Clean up any stopped containers left over
         cleanup_cmd = "docker container prune -f"
@@ -324,41 +580,38 @@ def archive(seed_urls, archive_file_name, item_identifier, num_seed_urls, args,
 
     except subprocess.SubprocessError as e:
         logging.error(f"Archiving subprocess failed: {e}")
-        return 0, 0
+    return captured_urls
 
 
 def process_publication(publication, sniffer, args):
     """Process a single publication by gathering articles and archiving them."""
-    website_url = publication.get("website")
+    website_url = publication.website
 
     seed_urls = []
 
-    # First try to get articles from RSS feeds
-    for rss_feed_url in publication.get("rss", []):
-        feed = feedparser.parse(normalize_rss_url(rss_feed_url))
-        for entry in feed.entries:
-            article_url = entry.link
-            if article_url and sniffer.guess(article_url):
-                seed_urls.append(article_url)
-                logging.info(f"RSS article found: {article_url}")
-                if len(seed_urls) >= args.max_articles:
-                    break
-                time.sleep(5)
+    # First try to get articles from RSS feeds (URLs are normalized by the publication index)
+    for feed_url in publication.feeds:
+        select_feed_story_urls(fetch_feed(feed_url), sniffer, seed_urls, args)
         if len(seed_urls) >= args.max_articles:
             break
 
+    # Sitemaps list recent articles with dates, which is cheaper than parsing the homepage
+    if SITEMAPS and len(seed_urls) < args.max_articles:
+        select_story_urls(sitemap_candidates(website_url), sniffer, seed_urls, args.max_articles, "Sitemap article", args.sniff_batch_size)
+
     # If not enough from RSS, fallback to scraping the website
     if len(seed_urls) < args.max_articles:
         try:
-            response = requests.get(website_url, headers=HEADERS, timeout=10)
-            response.raise_for_status()
-            for article_url in extract_article_urls_from_html(response.text, website_url):
-                if article_url and sniffer.guess(article_url):
-                    seed_urls.append(article_url)
-                    logging.info(f"Scraped article: {article_url}")
-                    if len(seed_urls) >= args.max_articles:
-                        break
-                    time.sleep(5)
+            request_url = homepage_request_url(website_url)
+            HOST_LIMITER.acquire(request_url)
+            with METRICS.timer("homepage_fetch") as event:
+                response = HTTP_CLIENT.get(request_url)
+                event.bytes = len(response.content)
+                response.raise_for_status()
+            # The GET already followed the redirects, so its final URL is the resolved base.
+            record_homepage_redirect(website_url, response.url)
+            article_urls = extract_article_urls_from_html(response.text, website_url, response.url)
+            select_story_urls(article_urls, sniffer, seed_urls, args.max_articles, "Scraped article", args.sniff_batch_size)
         except requests.RequestException as e:
             logging.error(f"Failed to scrape {website_url}: {e}")
 
@@ -370,6 +623,427 @@ def process_publication(publication, sniffer, args):
         logging.warning(f"No valid URLs for {website_url}")
 
 
+def sitemap_candidates(website_url):
+    """Return the newest article URLs from a website's sitemaps, or an empty list on failure."""
+    try:
+        with METRICS.timer("sitemap_discovery"):
+            return SITEMAPS.candidates(website_url)
+    except Exception as e:
+        logging.error(f"Sitemap discovery failed for {website_url}: {e}")
+        return []
+
+
+async def sitemap_candidates_async(session, website_url):
+    """Async counterpart of sitemap_candidates that fetches over the aiohttp session."""
+    try:
+        with METRICS.timer("sitemap_discovery"):
+            return await SITEMAPS.candidates_async(session, website_url)
+    except Exception as e:
+        logging.error(f"Sitemap discovery failed for {website_url}: {e}")
+        return []
+
+
+def select_story_urls(candidate_urls, sniffer, seed_urls, max_articles, label, batch_size=64):
+    """Append story-like candidate URLs to seed_urls until max_articles is reached.
+
+    Candidates are classified in batches so that a page with hundreds of links costs a
+    handful of model calls instead of one per link. A batch starts at the number of
+    stories still needed and doubles, up to batch_size, after each batch with rejected
+    candidates, so streamed feeds and pages are read no further than necessary.
+    """
+    batch = []
+    candidates = iter(candidate_urls)
+    scale = 1
+    while len(seed_urls) < max_articles:
+        size = min(batch_size, (max_articles - len(seed_urls)) * scale)
+        batch.clear()
+        for article_url in candidates:
+            if not article_url or (SEEN_INDEX and not SEEN_INDEX.is_new(canonicalize_url(article_url))):
+                continue
+            batch.append(article_url)
+            if len(batch) >= size:
+                break
+        if not batch:
+            break
+
+        with METRICS.timer("sniffing", urls=len(batch)):
+            verdicts = sniffer.guess_many(batch)
+
+        for article_url, is_story in zip(batch, verdicts):
+            if is_story:
+                seed_urls.append(article_url)
+                logging.info(f"{label}: {article_url}")
+                if len(seed_urls) >= max_articles:
+                    break
+        if not all(verdicts):
+            scale *= 2
+
+
+async def fetch_feed_async(session, feed_url):
+    """Download a normalized RSS feed URL; returns a generator that parses its entries as they are consumed."""
+    cached = FEED_CACHE.lookup(feed_url) if FEED_CACHE else None
+    request_headers = FEED_CACHE.conditional_headers(cached) if FEED_CACHE else {}
+
+    await HOST_LIMITER.acquire_async(feed_url)
+    fetch_start_time = time.perf_counter()
+    try:
+        async with session.get(feed_url, headers=request_headers) as response:
+            status = response.status
+            if cached and status == 304:
+                METRICS.observe("feed_fetch", time.perf_counter() - fetch_start_time, status=status)
+                FEED_CACHE.hit(feed_url)
+                return replay_cached_feed(feed_url, cached)
+            body = await response.read()
+            response_headers = feed_response_headers(response.headers, response.url)
+        METRICS.observe("feed_fetch", time.perf_counter() - fetch_start_time, len(body), status=status)
+    except Exception as e:
+        METRICS.observe("feed_fetch", time.perf_counter() - fetch_start_time, error=True)
+        logging.error(f"Failed to fetch feed {feed_url}: {e}")
+        return (entry for entry in ())
+
+    if PARSE_POOL:
+        entries = await PARSE_POOL.parse_feed_async(body, response_headers)
+        if FEED_CACHE and status == 200:
+            FEED_CACHE.store(feed_url, response_headers.get('ETag'), response_headers.get('Last-Modified'), entries)
+        return (entry for entry in entries)
+    return METRICS.timed_iter("feed_parse", read_feed_entries(feed_url, iter_body_chunks(body), status, response_headers))
+
+
+async def process_publication_async(publication, sniffer, args, session, semaphore):
+    """Async counterpart of process_publication returning the same seed list."""
+    website_url = publication.website
+
+    async with semaphore:
+        seed_urls = []
+
+        loop = asyncio.get_running_loop()
+        for feed_url in publication.feeds:
+            entries = await fetch_feed_async(session, feed_url)
+            # Entries are parsed while they are consumed, so keep both off the event loop.
+            await loop.run_in_executor(None, select_feed_story_urls, entries, sniffer, seed_urls, args)
+            if len(seed_urls) >= args.max_articles:
+                break
+
+        if SITEMAPS and len(seed_urls) < args.max_articles:
+            candidates = await sitemap_candidates_async(session, website_url)
+            # Sniffing and seen-index checks are CPU work, so keep them off the event loop too.
+            await loop.run_in_executor(
+                None, select_story_urls, candidates, sniffer, seed_urls, args.max_articles, "Sitemap article", args.sniff_batch_size
+            )
+
+        if len(seed_urls) < args.max_articles:
+            try:
+                request_url = homepage_request_url(website_url)
+                await HOST_LIMITER.acquire_async(request_url)
+                with METRICS.timer("homepage_fetch") as event:
+                    async with session.get(request_url) as response:
+                        response.raise_for_status()
+                        body = await response.read()
+                        event.bytes = len(body)
+                        html_content = body.decode(response.get_encoding(), errors="replace")
+                        resolved_base = str(response.url)
+                record_homepage_redirect(website_url, resolved_base)
+                article_urls = extract_article_urls_from_html(html_content, website_url, resolved_base)
+                # Parsing happens while the URLs are consumed, so keep both off the event loop.
+                await loop.run_in_executor(
+                    None, select_story_urls, article_urls, sniffer, seed_urls, args.max_articles, "Scraped article", args.sniff_batch_size
+                )
+            except Exception as e:
+                logging.error(f"Failed to scrape {website_url}: {e}")
+
+    if seed_urls:
+        seed_urls.append(website_url)
+        return seed_urls
+    else:
+        logging.warning(f"No valid URLs for {website_url}")
+
+
+async def discover_seeds_async(publications, sniffer, args):
+    """Collect seed URLs for all publications concurrently on one event loop."""
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(limit=args.async_concurrency, limit_per_host=args.async_per_host)
+    # Mirror the per-socket semantics of requests' timeout=10 so waiting for a pooled
+    # connection does not count against a request.
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=10)
+    semaphore = asyncio.Semaphore(args.async_concurrency)
+
+    connections = {"opened": 0, "reused": 0}
+
+    async def on_connection_create(session, context, params):
+        connections["opened"] += 1
+
+    async def on_connection_reuse(session, context, params):
+        connections["reused"] += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(on_connection_create)
+    trace_config.on_connection_reuseconn.append(on_connection_reuse)
+
+    seed_lists = []
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS, trace_configs=[trace_config]) as session:
+        tasks = [process_publication_async(pub, sniffer, args, session, semaphore) for pub in publications]
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                logging.error(f"Error processing publication asynchronously: {result}")
+            elif result:
+                seed_lists.append(result)
+    logging.info(f"Async HTTP session: {connections['opened']} connections opened, {connections['reused']} reused")
+    return seed_lists
+
+
+def collect_state_seeds(publications, sniffer, args):
+    """Collect seed URLs for every crawlable publication of a state.
+
+    publications maps media types to the state's compiled Publication records.
+    """
+    seed_urls = []
+
+    if args.discovery_engine == "async":
+        publications_list = interleave_by_host([
+            pub
+            for news_media in MEDIA_TYPES
+            for pub in publications.get(news_media, [])
+        ])
+        for publication_urls in asyncio.run(discover_seeds_async(publications_list, sniffer, args)):
+            seed_urls.extend(publication_urls)
+        return seed_urls
+
+    for news_media in MEDIA_TYPES:
+        publications_list = interleave_by_host(publications.get(news_media, []))
+
+        for future in run_publications(publications_list, sniffer, args):
+            try:
+                publication_urls = future.result()
+                if publication_urls:
+                    seed_urls.extend(publication_urls)
+            except Exception as e:
+                logging.error(f"Error processing publication in parallel: {e}")
+
+    return seed_urls
+
+
+def run_publications(publications_list, sniffer, args, max_workers=20):
+    """Run process_publication on a thread pool, yielding each future as it completes.
+
+    A publication is only started once its host has a full --host_burst of tokens and
+    no other publication of that host is running. Hosts that are still refilling are
+    skipped in favour of the next ready publication, so the workers spend their time
+    on requests rather than sleeping in HOST_LIMITER.acquire.
+    """
+    pending = deque(publications_list)
+    running = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            deferred = deque()
+            next_ready = None
+            while pending and len(running) < max_workers:
+                pub = pending.popleft()
+                if pub.host and pub.host in running.values():
+                    deferred.append(pub)
+                    continue
+                delay = HOST_LIMITER.ready_in(pub.website, HOST_LIMITER.burst)
+                if delay:
+                    deferred.append(pub)
+                    next_ready = delay if next_ready is None else min(next_ready, delay)
+                    continue
+                running[executor.submit(process_publication, pub, sniffer, args)] = pub.host
+            pending = deferred + pending
+
+            if not running:
+                time.sleep(next_ready)
+                continue
+            done, _ = concurrent.futures.wait(running, timeout=next_ready, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                del running[future]
+                yield future
+
+
+def discover_state(state, publications, sniffer, args):
+    """Collect the seed URLs of one state and log discovery statistics."""
+    logging.info(f"Processing state: {state}")
+    UPLOAD_SCHEDULER.wait_for_capacity("seed discovery")
+
+    seed_start_time = time.time()
+    seed_urls = collect_state_seeds(publications, sniffer, args)
+    collected = len(seed_urls)
+    seed_urls = dedupe_urls(seed_urls)
+    seed_duration = time.time() - seed_start_time
+
+    if collected:
+        logging.info(
+            f"Seed dedupe for {state}: {collected} -> {len(seed_urls)} URLs "
+            f"({(collected - len(seed_urls)) / collected:.1%} duplicates removed)"
+        )
+
+    if FEED_CACHE:
+        FEED_CACHE.log_stats()
+    if SEEN_INDEX:
+        SEEN_INDEX.log_stats()
+    if REDIRECT_CACHE:
+        REDIRECT_CACHE.log_stats()
+    if SITEMAPS:
+        SITEMAPS.log_stats()
+    HTTP_CLIENT.log_stats()
+    sniffer.log_stats()
+    sniffer.save()
+
+    return seed_urls, seed_duration
+
+
+def record_upload_queue(pending_files, pending_bytes):
+    """Export the upload queue depth as gauges."""
+    METRICS.set_gauge("upload_queue_files", pending_files, "Files queued or uploading to Internet Archive.")
+    METRICS.set_gauge("upload_queue_bytes", pending_bytes, "Bytes queued or uploading to Internet Archive.")
+
+
+def archive_state(state, seed_urls, seed_duration, archive_file_name, item_identifier, args, background_uploads, timing_log_file):
+    """Archive the seeds of one state and record its timings."""
+    if seed_urls:
+        captured_urls = archive(seed_urls, archive_file_name, item_identifier, len(seed_urls), args, background_uploads, state)
+        if SEEN_INDEX:
+            # Seeds that a failed or time-limited crawl never captured stay eligible for the next run.
+            captured = {canonicalize_url(url) for url in captured_urls}
+            SEEN_INDEX.add_many(url for url in map(canonicalize_url, seed_urls) if url in captured)
+    else:
+        logging.warning(f"No seed URLs collected for state: {state}. Skipping archive.")
+
+    # Log the timings to a file
+    with open(timing_log_file, "a") as logf:
+        logf.write(f"{state}: Seeds: {len(seed_urls)}, Seed collection: {seed_duration:.2f}\n")
+
+    UPLOAD_SCHEDULER.log_stats()
+    METRICS.write_prometheus()
+
+
+def schedule_archive_state(crawl_threads, archive_times, state, seed_urls, seed_duration, archive_file_name, item_identifier, args, background_uploads, timing_log_file):
+    """Archive a state once the crawl scheduler admits it.
+
+    Blocks until a crawl slot is free. With --max_concurrent_crawls above one the crawl
+    runs in a background thread that is appended to crawl_threads.
+    """
+    if not seed_urls:
+        archive_state(state, seed_urls, seed_duration, archive_file_name, item_identifier, args, background_uploads, timing_log_file)
+        return
+
+    def run():
+        archive_start_time = time.time()
+        try:
+            archive_state(state, seed_urls, seed_duration, archive_file_name, item_identifier, args, background_uploads, timing_log_file)
+        except Exception as e:
+            logging.error(f"Archiving failed for state {state}: {e}")
+        finally:
+            archive_times.append(time.time() - archive_start_time)
+            CRAWL_SCHEDULER.release(args.workers)
+
+    UPLOAD_SCHEDULER.wait_for_capacity("crawling")
+    CRAWL_SCHEDULER.acquire(args.workers)
+    if args.max_concurrent_crawls > 1:
+        crawl_thread = Thread(target=run)
+        crawl_thread.start()
+        crawl_threads.append(crawl_thread)
+    else:
+        run()
+
+
+def is_same_utc_day(timestamp):
+    """Check that the current UTC date is still the date of the run timestamp."""
+    return timestamp.strftime('%Y%m%d') == datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%d')
+
+
+def log_stage_utilization(wall_time, discovery_busy, archive_busy, timing_log_file):
+    """Log how busy the discovery and archive stages were over a daily run."""
+    wall_time = max(wall_time, 1e-9)
+    summary = (
+        f"Run wall time: {wall_time:.2f}, "
+        f"Discovery busy: {discovery_busy:.2f} ({discovery_busy / wall_time:.0%}), "
+        f"Archive busy: {archive_busy:.2f} ({archive_busy / wall_time:.0%}), "
+        f"Sum of stages: {discovery_busy + archive_busy:.2f}, Max of stages: {max(discovery_busy, archive_busy):.2f}"
+    )
+    logging.info(summary)
+    with open(timing_log_file, "a") as logf:
+        logf.write(f"{summary}\n")
+
+
+def run_states_sequential(selected_states, data, timestamp, item_identifier, sniffer, args, background_uploads, timing_log_file):
+    """Discover and archive states one after another."""
+    run_start_time = time.time()
+    discovery_busy = 0.0
+    crawl_threads = []
+    archive_times = []
+
+    for state in selected_states:
+        if not is_same_utc_day(timestamp):
+            break
+
+        archive_file_name = f"{args.item_identifier}-{state}-{timestamp.strftime('%Y%m%d')}-{timestamp.strftime('%H%M%S')}"
+
+        seed_urls, seed_duration = discover_state(state, data[state], sniffer, args)
+        discovery_busy += seed_duration
+
+        schedule_archive_state(crawl_threads, archive_times, state, seed_urls, seed_duration, archive_file_name, item_identifier, args, background_uploads, timing_log_file)
+
+    for crawl_thread in crawl_threads:
+        crawl_thread.join()
+
+    log_stage_utilization(time.time() - run_start_time, discovery_busy, sum(archive_times), timing_log_file)
+
+
+def run_states_pipelined(selected_states, data, timestamp, item_identifier, sniffer, args, background_uploads, timing_log_file):
+    """Discover seeds for upcoming states in a background thread while states are archived.
+
+    Discovery runs at most pipeline_depth states ahead of archiving, bounded by the queue.
+    """
+    seed_queue = queue.Queue(maxsize=max(1, args.pipeline_depth))
+    stop = Event()
+    discovery_busy = [0.0]
+
+    def discover_all():
+        try:
+            for state in selected_states:
+                if stop.is_set() or not is_same_utc_day(timestamp):
+                    break
+                seed_urls, seed_duration = discover_state(state, data[state], sniffer, args)
+                discovery_busy[0] += seed_duration
+                while not stop.is_set():
+                    try:
+                        seed_queue.put((state, seed_urls, seed_duration), timeout=1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            logging.error(f"Seed discovery pipeline failed: {e}")
+        finally:
+            if not stop.is_set():
+                seed_queue.put(None)
+
+    run_start_time = time.time()
+    crawl_threads = []
+    archive_times = []
+    discovery_thread = Thread(target=discover_all, daemon=True)
+    discovery_thread.start()
+
+    try:
+        while True:
+            item = seed_queue.get()
+            if item is None:
+                break
+            state, seed_urls, seed_duration = item
+            archive_file_name = f"{args.item_identifier}-{state}-{timestamp.strftime('%Y%m%d')}-{timestamp.strftime('%H%M%S')}"
+
+            schedule_archive_state(crawl_threads, archive_times, state, seed_urls, seed_duration, archive_file_name, item_identifier, args, background_uploads, timing_log_file)
+    finally:
+        stop.set()
+        # Unblock a producer waiting on a full queue so it can see the stop flag.
+        while not seed_queue.empty():
+            seed_queue.get_nowait()
+        discovery_thread.join()
+        for crawl_thread in crawl_threads:
+            crawl_thread.join()
+
+    log_stage_utilization(time.time() - run_start_time, discovery_busy[0], sum(archive_times), timing_log_file)
+
+
 def seconds_until_next_utc_midnight():
     now = datetime.datetime.utcnow()
     next_midnight = (now + datetime.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
@@ -379,7 +1053,43 @@ def seconds_until_next_utc_midnight():
 def main():
     args = get_arguments()
     setup_logger(args.log, args.log_level)
-    sniffer = StorySniffer()
+    sniffer = BatchStorySniffer(args.sniffer_cache or None, args.sniffer_cache_size)
+    HOST_LIMITER.configure(args.host_rate, args.host_burst)
+
+    global FEED_CACHE, SEEN_INDEX, REDIRECT_CACHE, SITEMAPS, PARSE_POOL, CRAWL_STATS, UPLOAD_JOURNAL, UPLOADER
+    if args.feed_cache:
+        FEED_CACHE = FeedCache(args.feed_cache, args.feed_cache_size)
+    if args.seen_index:
+        SEEN_INDEX = SeenArticleIndex(args.seen_index, args.seen_window_days)
+    if args.redirect_cache:
+        REDIRECT_CACHE = RedirectCache(args.redirect_cache, args.redirect_cache_ttl_days)
+    if args.parse_workers:
+        PARSE_POOL = ParsePool(args.parse_workers, args.parse_chunk_size)
+    if args.sitemap_cache:
+        SITEMAPS = SitemapDiscovery(args.sitemap_cache, args.sitemap_cache_ttl_days, HOST_LIMITER, HTTP_CLIENT)
+    if args.crawl_stats:
+        CRAWL_STATS = CrawlStatsStore(args.crawl_stats)
+    METRICS.configure(args.metrics_jsonl or None, args.metrics_prom or None)
+    CRAWL_SCHEDULER.max_containers = max(1, args.max_concurrent_crawls)
+    CRAWL_SCHEDULER.max_workers = args.max_total_workers
+    CRAWL_SCHEDULER.min_free_memory_mb = args.crawl_min_free_memory_mb
+    CRAWL_SCHEDULER.max_load = args.crawl_max_load
+    UPLOAD_SCHEDULER.configure(args.upload_concurrency, args.upload_bandwidth, args.max_pending_upload_bytes)
+    UPLOAD_SCHEDULER.on_change = record_upload_queue
+    UPLOAD_JOURNAL = UploadJournal(args.upload_journal)
+    ia_session = internetarchive.get_session()
+    UPLOADER = ResumableUploader(
+        UPLOAD_JOURNAL,
+        endpoint=args.upload_endpoint,
+        access_key=ia_session.access_key,
+        secret_key=ia_session.secret_key,
+        multipart_threshold=args.multipart_threshold,
+        part_size=args.multipart_part_size,
+        retries=args.upload_retries,
+        open_file=UPLOAD_SCHEDULER.open
+    )
+
+    publication_index = PublicationIndex(args.input, args.publication_index or None)
 
     logging.info("Starting news archiving process...")
 
@@ -387,7 +1097,7 @@ def main():
     last_run_date = None
 
     while True:
-        background_uploads = []
+        background_uploads = resume_uploads(args)
         try:
 
             current_date_str = datetime.datetime.utcnow().strftime('%Y-%m-%d')
@@ -399,8 +1109,11 @@ def main():
                 time.sleep(sleep_secs)
                 continue
 
-            with open(args.input, "r") as f:
-                data = json.load(f)
+            # Re-reads the input only when the file has changed since the last iteration.
+            publication_index.refresh()
+            data = publication_index.states
+            if SEEN_INDEX:
+                SEEN_INDEX.prune()
 
             states = list(data.keys())
             start = args.start
@@ -410,56 +1123,22 @@ def main():
             timestamp = datetime.datetime.now(datetime.timezone.utc)
             item_identifier = f"{args.item_identifier}-{timestamp.strftime('%Y%m%d')}"
 
-            for state in selected_states:
-                logging.info(f"Processing state: {state}")
-
-                seed_urls = []
-                timestamp_state = datetime.datetime.now(datetime.timezone.utc)
-                if timestamp.strftime('%Y%m%d') != timestamp_state.strftime('%Y%m%d'):
-                    break
-
-                archive_file_name = f"{args.item_identifier}-{state}-{timestamp.strftime('%Y%m%d')}-{timestamp.strftime('%H%M%S')}"
-
-                publications = data[state]
-
-                seed_start_time = time.time()
-
-                for news_media in ['newspaper', 'tv', 'radio', 'broadcast']:
-                    publications_list = [
-                        pub for pub in publications.get(news_media, [])
-                        if pub.get("website_status_code") in range(200, 400)
-                    ]
-
-                    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-                        futures = [executor.submit(process_publication, pub, sniffer, args) for pub in publications_list]
-                        for future in concurrent.futures.as_completed(futures):
-                            try:
-                                publication_urls = future.result()
-                                if publication_urls:
-                                    seed_urls.extend(publication_urls)
-                            except Exception as e:
-                                logging.error(f"Error processing publication in parallel: {e}")
-
-                seed_end_time = time.time()
-                seed_duration = seed_end_time - seed_start_time
-
-                if seed_urls:
-                    archive(seed_urls, archive_file_name, item_identifier, len(seed_urls), args, background_uploads)
-                else:
-                    logging.warning(f"No seed URLs collected for state: {state}. Skipping archive.")
-
-                # Log the timings to a file
-                with open(timing_log_file, "a") as logf:
-                        logf.write(f"{state}: Seeds: {len(seed_urls)}, Seed collection: {seed_duration:.2f}\n")
+            if args.pipeline:
+                run_states_pipelined(selected_states, data, timestamp, item_identifier, sniffer, args, background_uploads, timing_log_file)
+            else:
+                run_states_sequential(selected_states, data, timestamp, item_identifier, sniffer, args, background_uploads, timing_log_file)
 
             # Wait for all uploads to finish before sleeping
-            for t in background_uploads:
-                logging.info("Waiting for background upload to finish...")
-                t.join()
-                logging.info("Upload completed.")
-
-            s = internetarchive.get_session()
-            s.submit_tasks(item_identifier, cmd='derive.php')
+            if background_uploads:
+                logging.info(f"Waiting for {len(background_uploads)} background uploads to finish...")
+                concurrent.futures.wait(background_uploads)
+                logging.info("Uploads completed.")
+            UPLOAD_JOURNAL.log_stats()
+
+            with METRICS.timer("derive_submit", item=item_identifier):
+                s = internetarchive.get_session()
+                s.submit_tasks(item_identifier, cmd='derive.php')
+            METRICS.write_prometheus()
 
             last_run_date = current_date_str
 
@@ -1,12 +1,18 @@
 import os
 import datetime
+import hashlib
+import sqlite3
 import internetarchive
 import argparse
 import logging
+import time
+import concurrent.futures
 from internetarchive import upload
 
 # --- Configuration ---
 DAYS_BACK = 7
+WINDOW_DAYS = 30
+HASH_CHUNK_SIZE = 1 << 20
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 # --- Upload Function ---
@@ -27,72 +33,217 @@ def upload_wacz(directory, archive_file_name, item_identifier, upload_dest_file,
     except Exception as e:
         logging.error(f"Error uploading {item_identifier}/{upload_dest_file}: {e}")
 
+# --- Local Manifest ---
+class LocalManifest:
+    """SQLite cache of local file MD5s keyed by path, size and mtime.
+
+    A file is only hashed again when its size or modification time changes, so repeated
+    runs over a multi-terabyte collection directory only read new files. The manifest
+    also records which (item, day) pairs are fully reconciled, and whether their local
+    copies were deleted at the time.
+    """
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, md5 TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS verified_days (item TEXT, day TEXT, verified_at REAL, deleted INTEGER DEFAULT 0, PRIMARY KEY (item, day))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(verified_days)")}
+        if "deleted" not in columns:
+            self._conn.execute("ALTER TABLE verified_days ADD COLUMN deleted INTEGER DEFAULT 0")
+        self._conn.commit()
+
+    def verified_days(self, delete_verified):
+        """Return the set of (item, day) pairs that need no further work.
+
+        With delete_verified, days verified by a run that kept its local copies still
+        need their files deleted and are not returned.
+        """
+        query = "SELECT item, day FROM verified_days"
+        if delete_verified:
+            query += " WHERE deleted = 1"
+        return set(self._conn.execute(query))
+
+    def mark_verified(self, item, day, deleted):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO verified_days (item, day, verified_at, deleted) VALUES (?, ?, ?, ?)",
+            (item, day, time.time(), int(deleted))
+        )
+        self._conn.commit()
+
+    def lookup(self, path, size, mtime_ns):
+        """Return the cached MD5 of a file, or None if it is unknown or has changed."""
+        row = self._conn.execute(
+            "SELECT md5 FROM files WHERE path = ? AND size = ? AND mtime_ns = ?", (path, size, mtime_ns)
+        ).fetchone()
+        return row[0] if row else None
+
+    def store_many(self, entries):
+        """Record (path, size, mtime_ns, md5) tuples."""
+        self._conn.executemany("INSERT OR REPLACE INTO files (path, size, mtime_ns, md5) VALUES (?, ?, ?, ?)", entries)
+        self._conn.commit()
+
+    def forget(self, paths):
+        self._conn.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in paths))
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
 # --- Helper Functions ---
+def md5_file(path):
+    """Return the hex MD5 of a file, read in fixed-size chunks into a reused buffer."""
+    digest = hashlib.md5()
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            count = f.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+    return digest.hexdigest()
+
+def hash_files(paths, workers):
+    """Hash files in a process pool; returns {path: md5}, leaving out files that could not be read."""
+    hashes = {}
+    if not paths:
+        return hashes
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(md5_file, path): path for path in paths}
+        for future in concurrent.futures.as_completed(futures):
+            path = futures[future]
+            try:
+                hashes[path] = future.result()
+            except Exception as e:
+                logging.error(f"Could not hash {path}: {e}")
+    return hashes
+
 def get_wacz_files_from_local(base_dir):
-    wacz_files = []
+    """Return {path relative to base_dir: (absolute path, size, mtime_ns)} of the .wacz files."""
+    wacz_files = {}
     for root, dirs, files in os.walk(base_dir):
         for f in files:
             if f.endswith('.wacz'):
-                relative_path = os.path.relpath(os.path.join(root, f), base_dir)
-                wacz_files.append(relative_path.replace("\\", "/"))
-    return set(wacz_files)
+                path = os.path.join(root, f)
+                st = os.stat(path)
+                relative_path = os.path.relpath(path, base_dir).replace("\\", "/")
+                wacz_files[relative_path] = (path, st.st_size, st.st_mtime_ns)
+    return wacz_files
 
-def get_wacz_files_from_ia(identifier, target_day):
+def get_wacz_files_from_ia(identifier):
+    """Return {name: (size, md5)} of all the item's .wacz files."""
     item = internetarchive.get_item(identifier)
-    return set(
-        f['name']
+    return {
+        f['name']: (int(f.get('size', -1)), f.get('md5'))
         for f in item.files
-        if f['name'].startswith(f'{target_day}/') and f['name'].endswith('.wacz')
-    )
+        if f['name'].endswith('.wacz')
+    }
 
-def process_item_for_state(state, year, month, day, args):
-    item_identifier = f"{args.collection}-{state}-{year}-{month}"
-    local_base_dir = os.path.join(args.collection_directory, item_identifier, day)
+def fetch_remote_manifests(identifiers, workers):
+    """Fetch the metadata of several items concurrently; failed items map to None."""
+    manifests = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(get_wacz_files_from_ia, identifier): identifier for identifier in identifiers}
+        for future in concurrent.futures.as_completed(futures):
+            identifier = futures[future]
+            try:
+                manifests[identifier] = future.result()
+            except Exception as e:
+                logging.error(f"Could not fetch metadata for {identifier}: {e}")
+                manifests[identifier] = None
+    return manifests
 
-    if not os.path.isdir(local_base_dir):
-        logging.warning(f"No local directory found for {local_base_dir}. Skipping.")
-        return
+def delete_verified(path, size, mtime_ns, base_dir):
+    """Delete a verified file if it is unchanged since it was hashed, then prune empty directories."""
+    st = os.stat(path)
+    if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+        logging.warning(f"Not deleting {path}: it changed after it was verified")
+        return False
+    os.remove(path)
+    parent = os.path.dirname(path)
+    while os.path.abspath(parent) != os.path.abspath(base_dir) and not os.listdir(parent):
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
+    return True
 
-    logging.info(f"Checking {item_identifier} for day {day}...")
+def process_item_for_state(item_identifier, local_base_dir, day, local_files, remote_files, local_md5s, args):
+    """Compare one item day's local files with the remote manifest, upload missing files and delete verified ones.
 
-    local_files = get_wacz_files_from_local(local_base_dir)
-    remote_files = get_wacz_files_from_ia(item_identifier, day)
+    Returns the deleted paths and whether the day is fully reconciled.
+    """
+    logging.info(f"Checking {item_identifier} for day {day}...")
+    remote_files = {name: remote for name, remote in remote_files.items() if name.startswith(f"{day}/")}
 
-    only_local = local_files - remote_files
-    only_remote = remote_files - local_files
+    verified = []
+    missing = []
+    for relative_path, (path, size, mtime_ns) in sorted(local_files.items()):
+        remote_name = f"{day}/{relative_path}"
+        remote = remote_files.get(remote_name)
+        if remote is None:
+            missing.append(relative_path)
+        elif remote != (size, local_md5s.get(path)):
+            logging.warning(
+                f"Remote copy of {item_identifier}/{remote_name} differs (remote size/md5 {remote}, "
+                f"local {size}/{local_md5s.get(path)}); uploading again"
+            )
+            missing.append(relative_path)
+        else:
+            verified.append(relative_path)
 
-    if only_local:
+    if missing:
         logging.info("Found missing uploads. Uploading...")
-        for f in sorted(only_local):
+        for f in missing:
             cleaned_hostname = f.split('/')[0]
             archive_file_name = os.path.splitext(os.path.basename(f))[0]
             upload_wacz(
                 os.path.join(local_base_dir, cleaned_hostname),
                 archive_file_name,
                 item_identifier,
-                f,
+                f"{day}/{f}",
                 args
             )
     else:
         logging.info("All local files exist on the Internet Archive.")
 
+    only_remote = set(remote_files) - {f"{day}/{f}" for f in local_files}
     if only_remote:
         logging.info("These files exist remotely but not locally:")
         for f in sorted(only_remote):
             logging.info(f"  {f}")
 
+    deleted = []
+    if args.delete_verified:
+        for relative_path in verified:
+            path, size, mtime_ns = local_files[relative_path]
+            try:
+                if delete_verified(path, size, mtime_ns, local_base_dir):
+                    deleted.append(path)
+            except OSError as e:
+                logging.error(f"Could not delete {path}: {e}")
+    logging.info(f"{item_identifier} day {day}: {len(verified)} verified, {len(missing)} uploaded, {len(deleted)} deleted")
+    # Re-uploaded files are verified again on the next run before the day counts as done.
+    complete = not missing and (not args.delete_verified or len(deleted) == len(verified))
+    return deleted, complete
+
 # --- Main Logic ---
+def sweep_days(today, days_back, window_days):
+    """Return the dates from days_back to days_back + window_days - 1 days ago, oldest first."""
+    return [today - datetime.timedelta(days=n) for n in range(days_back + window_days - 1, days_back - 1, -1)]
+
 def main(args):
     today = datetime.datetime.utcnow().date()
-    target_date = today - datetime.timedelta(days=DAYS_BACK)
+    dates = sweep_days(today, args.days_back, args.window_days)
+    logging.info(f"Running verification for {dates[0]} to {dates[-1]}")
 
-    year = target_date.year
-    month = str(target_date.month).zfill(2)
-    day = str(target_date.day)
-
-    logging.info(f"Running verification for {year}-{month}-{day}")
+    manifest = LocalManifest(args.manifest)
+    verified_days = manifest.verified_days(args.delete_verified)
 
     # Discover states by scanning directory names
+    states = set()
     for entry in os.listdir(args.collection_directory):
         if not entry.startswith(args.collection + "-"):
             continue
@@ -102,12 +253,58 @@ def main(args):
         if len(parts) < 4:
             continue
 
-        state = parts[1].lower()
+        states.add(parts[1].lower())
+
+    # Collect every unreconciled (item, day) that has a local directory.
+    units = {}
+    skipped = 0
+    for target_date in dates:
+        month = str(target_date.month).zfill(2)
+        # Day directories and remote names are zero-padded by the crawler.
+        day = str(target_date.day).zfill(2)
+        for state in sorted(states):
+            item_identifier = f"{args.collection}-{state}-{target_date.year}-{month}"
+            if (item_identifier, day) in verified_days:
+                skipped += 1
+                continue
+            local_base_dir = os.path.join(args.collection_directory, item_identifier, day)
+            if not os.path.isdir(local_base_dir):
+                continue
+            units[(item_identifier, day)] = (local_base_dir, get_wacz_files_from_local(local_base_dir))
+    logging.info(f"{len(units)} item days to reconcile, {skipped} already verified")
+    if not units:
+        manifest.close()
+        return
+
+    remote_manifests = fetch_remote_manifests(sorted({item for item, _ in units}), args.metadata_workers)
+
+    # Hash only files whose size or mtime changed since they were last hashed.
+    local_md5s = {}
+    to_hash = {}
+    for local_base_dir, local_files in units.values():
+        for path, size, mtime_ns in local_files.values():
+            md5 = manifest.lookup(path, size, mtime_ns)
+            if md5:
+                local_md5s[path] = md5
+            else:
+                to_hash[path] = (size, mtime_ns)
+    logging.info(f"Hashing {len(to_hash)} files ({len(local_md5s)} cached in the manifest)")
+    hashes = hash_files(list(to_hash), args.hash_workers)
+    local_md5s.update(hashes)
+    manifest.store_many((path, *to_hash[path], md5) for path, md5 in hashes.items())
 
+    for (item_identifier, day), (local_base_dir, local_files) in sorted(units.items()):
+        remote_files = remote_manifests.get(item_identifier)
+        if remote_files is None:
+            continue
         try:
-            process_item_for_state(state, year, month, day, args)
+            deleted, complete = process_item_for_state(item_identifier, local_base_dir, day, local_files, remote_files, local_md5s, args)
+            manifest.forget(deleted)
+            if complete:
+                manifest.mark_verified(item_identifier, day, args.delete_verified)
         except Exception as e:
-            logging.error(f"Error processing state {state}: {e}")
+            logging.error(f"Error processing {item_identifier} day {day}: {e}")
+    manifest.close()
 
 # --- CLI ---
 if __name__ == "__main__":
@@ -116,6 +313,12 @@ if __name__ == "__main__":
     parser.add_argument("--collection_directory", required=True)
     parser.add_argument("--uploader", default="Alexander C. Nwala <alexandernwala@gmail.com>", help="Uploader identity")
     parser.add_argument("--mediatype", default="web", help="Default: web")
+    parser.add_argument("--manifest", default="verify_manifest.sqlite3", help="Path to the cached manifest of local file sizes and MD5s")
+    parser.add_argument("--metadata_workers", type=int, default=16, help="Number of items whose metadata is fetched concurrently")
+    parser.add_argument("--hash_workers", type=int, default=os.cpu_count() or 1, help="Number of processes hashing local files")
+    parser.add_argument("--days_back", type=int, default=DAYS_BACK, help="Only reconcile days at least this many days old")
+    parser.add_argument("--window_days", type=int, default=WINDOW_DAYS, help="Number of days, ending at --days_back, swept for unreconciled item days")
+    parser.add_argument("--delete_verified", action="store_true", help="Delete local files whose size and MD5 match the Internet Archive copy")
 
     args = parser.parse_args()
     main(args)
@@ -0,0 +1,104 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+
+class FeedCache:
+    """Persistent cache of feed validators (ETag / Last-Modified) and parsed entries.
+
+    Entries are stored as a list of {"link", "published"} dicts, which is all seed
+    discovery reads from a feed, together with whether that list covers the whole
+    feed or discovery stopped reading early. The cache keeps at most `max_feeds` feeds and evicts
+    the least recently used ones beyond that.
+    """
+
+    def __init__(self, path, max_feeds=20000):
+        self.path = path
+        self.max_feeds = max_feeds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS feeds ("
+            "url TEXT PRIMARY KEY, etag TEXT, modified TEXT, entries TEXT, last_used REAL, complete INTEGER DEFAULT 1)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(feeds)")}
+        if "complete" not in columns:
+            self._conn.execute("ALTER TABLE feeds ADD COLUMN complete INTEGER DEFAULT 1")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS feeds_last_used ON feeds (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM feeds").fetchone()[0]
+
+    def lookup(self, url):
+        """Return (etag, modified, entries, complete) for a cached feed, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, modified, entries, complete FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, modified, entries, complete = row
+        return etag, modified, json.loads(entries), bool(complete)
+
+    def conditional_headers(self, cached):
+        """Build If-None-Match / If-Modified-Since headers from a lookup() result."""
+        headers = {}
+        if cached:
+            etag, modified = cached[:2]
+            if etag:
+                headers['If-None-Match'] = etag
+            if modified:
+                headers['If-Modified-Since'] = modified
+        return headers
+
+    def hit(self, url):
+        """Record that a feed was served from the cache after a 304 response."""
+        with self._lock:
+            self.hits += 1
+            self._conn.execute("UPDATE feeds SET last_used = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        logging.debug(f"Feed cache hit: {url}")
+
+    def store(self, url, etag, modified, entries, complete=True):
+        """Record a freshly downloaded feed and evict old feeds if over capacity.
+
+        Pass complete=False when entries stops short of the end of the feed.
+        """
+        with self._lock:
+            self.misses += 1
+            if not etag and not modified:
+                # Without validators the server can never answer 304, so there is nothing to reuse.
+                return
+            exists = self._conn.execute("SELECT 1 FROM feeds WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feeds (url, etag, modified, entries, last_used, complete) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, modified, json.dumps(entries), time.time(), int(complete))
+            )
+            if not exists:
+                self._size += 1
+            if self._size > self.max_feeds:
+                excess = self._size - self.max_feeds
+                self._conn.execute(
+                    "DELETE FROM feeds WHERE url IN (SELECT url FROM feeds ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                self._size -= excess
+                self.evictions += excess
+            self._conn.commit()
+
+    def log_stats(self):
+        """Log hit/miss counters for this run."""
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0.0
+        logging.info(
+            f"Feed cache: {self.hits} hits, {self.misses} misses ({ratio:.1%} hit rate), "
+            f"{self.evictions} evictions, {self._size} feeds cached"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,97 @@
+import logging
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin
+
+import feedparser
+from requests.structures import CaseInsensitiveDict
+
+CHUNK_SIZE = 16384
+ENTRY_TAGS = ("item", "entry")
+# Same precedence as feedparser's "published": RSS pubDate, Atom published/issued, dcterms:issued.
+PUBLISHED_TAGS = ("pubDate", "published", "issued")
+
+
+def feed_response_headers(headers, url):
+    """Copy a feed response's headers for parsing and caching, with the final URL as content-location.
+
+    Lookups such as headers.get('ETag') stay case-insensitive however the server or
+    HTTP library spells the header.
+    """
+    response_headers = CaseInsensitiveDict(headers)
+    response_headers['content-location'] = str(url)
+    return response_headers
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _entry_record(element, base_url):
+    """Reduce an RSS <item> or Atom <entry> element to a {"link", "published"} dict."""
+    link = guid = published = None
+    for child in element:
+        tag = _local(child.tag)
+        if tag == "link" and link is None:
+            href = child.get("href")
+            if href is not None:
+                if child.get("rel", "alternate") == "alternate":
+                    link = href.strip()
+            elif child.text and child.text.strip():
+                link = child.text.strip()
+        elif tag == "guid" and child.get("isPermaLink", "true") == "true":
+            guid = (child.text or "").strip() or None
+        elif tag in PUBLISHED_TAGS and published is None:
+            published = (child.text or "").strip() or None
+    link = link or guid
+    if link and base_url:
+        link = urljoin(base_url, link)
+    return {"link": link, "published": published}
+
+
+def iter_feed_entries(chunks, response_headers=None):
+    """Yield {"link", "published"} dicts from RSS, RDF or Atom byte chunks as they are parsed.
+
+    Only as many chunks are read as needed for the entries the caller consumes, and
+    each entry's element is discarded once it has been reduced. A document that is
+    not well-formed XML is handed to feedparser instead, skipping the entries that
+    were already yielded.
+    """
+    response_headers = response_headers or {}
+    base_url = response_headers.get("content-location")
+    parser = ET.XMLPullParser(events=("start", "end"))
+    received = []
+    yielded = 0
+    depth = 0
+    chunks = iter(chunks)
+    try:
+        for chunk in chunks:
+            received.append(chunk)
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if _local(element.tag) not in ENTRY_TAGS:
+                    continue
+                if event == "start":
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth:
+                    continue
+                record = _entry_record(element, base_url)
+                element.clear()
+                yielded += 1
+                yield record
+        parser.close()
+        return
+    except ET.ParseError as e:
+        logging.debug(f"Feed {base_url} is not well-formed XML ({e}), falling back to feedparser")
+
+    received.extend(chunks)
+    parsed = feedparser.parse(b"".join(received), response_headers=response_headers)
+    for entry in parsed.entries[yielded:]:
+        yield {"link": entry.get("link"), "published": entry.get("published")}
+
+
+def iter_body_chunks(body, chunk_size=CHUNK_SIZE):
+    """Split an already downloaded body into chunks for iter_feed_entries."""
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
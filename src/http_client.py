@@ -0,0 +1,107 @@
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36'
+}
+
+
+class _ConnectionCounter:
+    """Thread-safe count of TCP/TLS connections opened by the pools."""
+
+    def __init__(self):
+        self.opened = 0
+        self._lock = threading.Lock()
+
+    def increment(self):
+        with self._lock:
+            self.opened += 1
+
+
+def _counting_pool(pool_class, counter):
+    class CountingPool(pool_class):
+        def _new_conn(self):
+            counter.increment()
+            return super()._new_conn()
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose per-host connection pools count the connections they open."""
+
+    def __init__(self, counter, **kwargs):
+        self.counter = counter
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self.counter),
+            "https": _counting_pool(HTTPSConnectionPool, self.counter),
+        }
+
+
+class HttpClient:
+    """Pooled, keep-alive HTTP client shared by every discovery request.
+
+    Each thread gets its own requests.Session, but all sessions share one adapter, so
+    connections are pooled per host (up to `pool_hosts` hosts, `pool_size` idle
+    connections each) and reused across threads. Requests carry `headers` and
+    `timeout` unless the caller passes its own. Responses are decompressed
+    transparently; brotli is accepted when the brotli package is installed.
+    """
+
+    def __init__(self, headers=None, timeout=10, pool_hosts=512, pool_size=4):
+        self.headers = dict(headers or HEADERS)
+        self.timeout = timeout
+        self.responses = 0
+        self._counter = _ConnectionCounter()
+        self._adapter = _CountingAdapter(self._counter, pool_connections=pool_hosts, pool_maxsize=pool_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def session(self):
+        """Return this thread's session."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            session.hooks["response"].append(self._count_response)
+            self._local.session = session
+        return session
+
+    def _count_response(self, response, *args, **kwargs):
+        with self._lock:
+            self.responses += 1
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session().request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+    def summary(self):
+        """Return how many responses were served over reused connections this run."""
+        with self._lock:
+            responses = self.responses
+        opened = self._counter.opened
+        reused = max(responses - opened, 0)
+        ratio = reused / responses if responses else 0.0
+        return f"{responses} responses, {opened} connections opened, {reused} reused ({ratio:.1%} reuse)"
+
+    def log_stats(self):
+        logging.info(f"HTTP client: {self.summary()}")
+
+    def close(self):
+        self._adapter.close()
@@ -0,0 +1,43 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+
+class _AnchorParser(HTMLParser):
+    """Collect the href of every <a> tag as the document is tokenized."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hrefs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        for name, value in attrs:
+            if name == "href" and value is not None:
+                self.hrefs.append(value)
+                return
+
+
+def iter_links(html_content, base_url, chunk_size=16384):
+    """Yield unique absolute <a href> URLs in document order while parsing incrementally.
+
+    The document is fed to the parser chunk_size characters at a time, so a caller
+    that stops iterating early also stops the parsing.
+    """
+    parser = _AnchorParser()
+    seen = set()
+    for start in range(0, len(html_content), chunk_size):
+        parser.feed(html_content[start:start + chunk_size])
+        for href in parser.hrefs:
+            url = urljoin(base_url, href)
+            if url not in seen:
+                seen.add(url)
+                yield url
+        parser.hrefs.clear()
+
+    parser.close()
+    for href in parser.hrefs:
+        url = urljoin(base_url, href)
+        if url not in seen:
+            seen.add(url)
+            yield url
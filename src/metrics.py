@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets, from HTTP fetches to Docker crawls.
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600, float("inf"))
+
+
+class _StageStats:
+    __slots__ = ("bucket_counts", "count", "total_seconds", "bytes", "errors")
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.bytes = 0
+        self.errors = 0
+
+
+class StageEvent:
+    """Mutable handle yielded by Metrics.timer so callers can attach bytes, errors and labels."""
+
+    __slots__ = ("bytes", "error", "labels")
+
+    def __init__(self, labels):
+        self.bytes = 0
+        self.error = False
+        self.labels = labels
+
+
+class Metrics:
+    """Per-stage latency histograms, byte counts and error counts.
+
+    Every observation is appended to a JSONL event log when `jsonl_path` is set, and
+    `write_prometheus` renders the cumulative totals, plus any gauges, in the
+    Prometheus textfile collector format.
+    """
+
+    def __init__(self, jsonl_path=None, prometheus_path=None):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self._stages = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._jsonl = None
+
+    def configure(self, jsonl_path=None, prometheus_path=None):
+        """Set the output files; pass None to disable an output."""
+        with self._lock:
+            if self._jsonl:
+                self._jsonl.close()
+                self._jsonl = None
+            self.jsonl_path = jsonl_path
+            self.prometheus_path = prometheus_path
+
+    def observe(self, stage, seconds, nbytes=0, error=False, **labels):
+        """Record one occurrence of a stage."""
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats()
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats.bucket_counts[i] += 1
+                    break
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.bytes += nbytes
+            stats.errors += int(bool(error))
+
+            if self.jsonl_path:
+                if self._jsonl is None:
+                    self._jsonl = open(self.jsonl_path, "a", buffering=1)
+                event = {"ts": round(time.time(), 3), "stage": stage, "seconds": round(seconds, 6), "bytes": nbytes, "error": bool(error)}
+                event.update(labels)
+                self._jsonl.write(json.dumps(event) + "\n")
+
+    def set_gauge(self, name, value, help_text=""):
+        """Set a point-in-time value exported as crawler_<name>."""
+        with self._lock:
+            self._gauges[name] = (value, help_text)
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """Time a block as one occurrence of a stage; exceptions are counted as errors and re-raised."""
+        event = StageEvent(labels)
+        start = time.perf_counter()
+        try:
+            yield event
+        except BaseException:
+            event.error = True
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, event.bytes, event.error, **event.labels)
+
+    def timed_iter(self, stage, iterable, **labels):
+        """Yield from iterable, recording the time spent producing items as one stage occurrence."""
+        elapsed = 0.0
+        error = False
+        iterator = iter(iterable)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - start
+                    return
+                except Exception:
+                    error = True
+                    raise
+                elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            self.observe(stage, elapsed, 0, error, **labels)
+
+    def write_prometheus(self):
+        """Atomically write the cumulative metrics for the node_exporter textfile collector."""
+        if not self.prometheus_path:
+            return
+        with self._lock:
+            stages = sorted(self._stages.items())
+            lines = [
+                "# HELP crawler_stage_duration_seconds Time spent per occurrence of a crawler stage.",
+                "# TYPE crawler_stage_duration_seconds histogram",
+            ]
+            for stage, stats in stages:
+                cumulative = 0
+                for bound, count in zip(BUCKETS, stats.bucket_counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'crawler_stage_duration_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'crawler_stage_duration_seconds_sum{{stage="{stage}"}} {stats.total_seconds:.6f}')
+                lines.append(f'crawler_stage_duration_seconds_count{{stage="{stage}"}} {stats.count}')
+            lines.append("# HELP crawler_stage_bytes_total Bytes transferred or written by a crawler stage.")
+            lines.append("# TYPE crawler_stage_bytes_total counter")
+            for stage, stats in stages:
+                lines.append(f'crawler_stage_bytes_total{{stage="{stage}"}} {stats.bytes}')
+            lines.append("# HELP crawler_stage_errors_total Failed occurrences of a crawler stage.")
+            lines.append("# TYPE crawler_stage_errors_total counter")
+            for stage, stats in stages:
+                lines.append(f'crawler_stage_errors_total{{stage="{stage}"}} {stats.errors}')
+            for name, (value, help_text) in sorted(self._gauges.items()):
+                if help_text:
+                    lines.append(f"# HELP crawler_{name} {help_text}")
+                lines.append(f"# TYPE crawler_{name} gauge")
+                lines.append(f"crawler_{name} {value}")
+
+        with self._write_lock:
+            tmp_path = f"{self.prometheus_path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp_path, self.prometheus_path)
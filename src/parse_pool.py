@@ -0,0 +1,54 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+from itertools import islice
+
+from feed_reader import iter_body_chunks, iter_feed_entries
+from link_extractor import iter_links
+
+
+def parse_feed(body, response_headers):
+    """Parse a downloaded feed body into {"link", "published"} entry records."""
+    return list(iter_feed_entries(iter_body_chunks(body), response_headers))
+
+
+def extract_links(html_content, base_url, limit):
+    """Return the first limit links of a page, parsing only as far as needed."""
+    return list(islice(iter_links(html_content, base_url), limit))
+
+
+class ParsePool:
+    """Process pool that parses feed and homepage bodies outside the GIL.
+
+    Downloads stay on threads or the event loop; only the CPU-bound parsing is sent to
+    `workers` processes. Homepage links come back `chunk_size` at a time, so a caller
+    that stops early only pays for the chunks it consumed.
+    """
+
+    def __init__(self, workers, chunk_size=200):
+        self.chunk_size = chunk_size
+        # Spawned workers do not inherit the parent's threads or held locks.
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def parse_feed(self, body, response_headers):
+        return self._executor.submit(parse_feed, body, response_headers).result()
+
+    async def parse_feed_async(self, body, response_headers):
+        return await asyncio.wrap_future(self._executor.submit(parse_feed, body, response_headers))
+
+    def iter_links(self, html_content, base_url):
+        """Yield a page's links in document order, extracted in a worker."""
+        yielded = 0
+        limit = self.chunk_size
+        while True:
+            links = self._executor.submit(extract_links, html_content, base_url, limit).result()
+            yield from links[yielded:]
+            if len(links) < limit:
+                return
+            yielded = limit
+            limit *= 2
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
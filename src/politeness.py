@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def host_key(url):
+    """Return the politeness key (lower-cased hostname without www.) of a URL."""
+    try:
+        host = (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+class HostRateLimiter:
+    """Token bucket rate limiter keyed by hostname.
+
+    Each host gets `burst` requests immediately and then `rate` requests per second.
+    Callers reserve a slot before each HTTP request and only wait for their own host,
+    so requests to other hosts are never held back. `ready_in` lets a scheduler defer
+    work for a host until its bucket has refilled instead of sleeping in `acquire`.
+    """
+
+    def __init__(self, rate=1.0, burst=3):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def configure(self, rate, burst):
+        """Update the rate limits and forget previous per-host state."""
+        with self._lock:
+            self.rate = rate
+            self.burst = max(1, burst)
+            self._buckets.clear()
+
+    def reserve(self, url):
+        """Take a token for the URL's host and return the seconds to wait before using it."""
+        host = host_key(url)
+        if not host or self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate) - 1
+            self._buckets[host] = (tokens, now)
+
+        return -tokens / self.rate if tokens < 0 else 0.0
+
+    def ready_in(self, url, tokens=1):
+        """Return the seconds until the URL's host has `tokens` tokens (capped at burst), without taking any."""
+        host = host_key(url)
+        if not host or self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            available, last = self._buckets.get(host, (self.burst, now))
+            available = min(self.burst, available + (now - last) * self.rate)
+
+        return max(0.0, (min(tokens, self.burst) - available) / self.rate)
+
+    def acquire(self, url):
+        """Block the calling thread until a request to the URL's host is allowed."""
+        delay = self.reserve(url)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self, url):
+        """Wait on the event loop until a request to the URL's host is allowed."""
+        delay = self.reserve(url)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def interleave_by_host(publications):
+    """Order Publication records round-robin by host so the same host is not hit back to back."""
+    by_host = {}
+    for publication in publications:
+        by_host.setdefault(publication.host, []).append(publication)
+
+    queues = list(by_host.values())
+    interleaved = []
+    index = 0
+    while queues:
+        queues = [queue for queue in queues if len(queue) > index]
+        interleaved.extend(queue[index] for queue in queues)
+        index += 1
+    return interleaved
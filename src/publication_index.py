@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+from politeness import host_key
+
+INDEX_VERSION = 1
+MEDIA_TYPES = ('newspaper', 'tv', 'radio', 'broadcast')
+
+
+def normalize_rss_url(url):
+    """Ensure RSS feed uses HTTPS and encode its query parameters."""
+    parsed = urlparse(url)
+    scheme = "https"
+    encoded_query = urlencode(parse_qsl(parsed.query, keep_blank_values=True), doseq=True)
+    return urlunparse((scheme, parsed.netloc, parsed.path, parsed.params, encoded_query, parsed.fragment)).replace("&", "&amp;")
+
+
+class Publication:
+    """A crawlable outlet reduced to what seed discovery needs."""
+
+    __slots__ = ("website", "host", "feeds")
+
+    def __init__(self, website, host, feeds):
+        self.website = website
+        self.host = host
+        self.feeds = feeds
+
+    def __getstate__(self):
+        return (self.website, self.host, self.feeds)
+
+    def __setstate__(self, state):
+        self.website, self.host, self.feeds = state
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compile_publications(data):
+    """Return {state: {media type: [Publication]}} of the publications whose website responded with 2xx/3xx."""
+    states = {}
+    for state, media in data.items():
+        states[state] = {
+            news_media: [
+                Publication(pub["website"], host_key(pub["website"]), tuple(normalize_rss_url(url) for url in pub.get("rss", [])))
+                for pub in media.get(news_media, [])
+                if pub.get("website") and pub.get("website_status_code") in range(200, 400)
+            ]
+            for news_media in MEDIA_TYPES
+        }
+    return states
+
+
+class PublicationIndex:
+    """Compiled, pickled view of the input dataset that is rebuilt only when the source changes.
+
+    `refresh` costs one stat() while the source file's size and mtime are unchanged. When
+    they change the file is hashed, and the index is recompiled only if the content differs.
+    """
+
+    def __init__(self, source_path, index_path):
+        self.source_path = source_path
+        self.index_path = index_path
+        self.states = {}
+        self._stat = None
+        self._sha256 = None
+
+    def refresh(self):
+        """Make `states` reflect the current source file."""
+        st = os.stat(self.source_path)
+        stat = (st.st_size, st.st_mtime_ns)
+        if stat == self._stat:
+            return
+        if self._stat is None and self.index_path:
+            self._load()
+            if stat == self._stat:
+                return
+
+        sha256 = file_sha256(self.source_path)
+        if sha256 != self._sha256:
+            logging.info(f"Compiling publication index from {self.source_path}")
+            with open(self.source_path, "r") as f:
+                self.states = compile_publications(json.load(f))
+            self._sha256 = sha256
+        self._stat = stat
+        self._save()
+        logging.info(f"Publication index: {sum(len(pubs) for media in self.states.values() for pubs in media.values())} crawlable publications in {len(self.states)} states")
+
+    def _load(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                index = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+        if index.get("version") != INDEX_VERSION or index.get("source") != os.path.abspath(self.source_path):
+            return
+        self.states = index["states"]
+        self._stat = index["stat"]
+        self._sha256 = index["sha256"]
+
+    def _save(self):
+        if not self.index_path:
+            return
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({
+                "version": INDEX_VERSION,
+                "source": os.path.abspath(self.source_path),
+                "stat": self._stat,
+                "sha256": self._sha256,
+                "states": self.states,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.index_path)
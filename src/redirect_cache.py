@@ -0,0 +1,60 @@
+import logging
+import sqlite3
+import threading
+import time
+
+
+class RedirectCache:
+    """Persistent TTL cache mapping homepage URLs to the URL their redirects end at.
+
+    Entries older than `ttl_days` are treated as missing, so a site that changes its
+    canonical address is picked up again within the TTL.
+    """
+
+    def __init__(self, path, ttl_days=7):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS redirects (url TEXT PRIMARY KEY, resolved TEXT, resolved_at REAL)")
+        self._conn.execute("DELETE FROM redirects WHERE resolved_at < ?", (time.time() - self.ttl,))
+        self._conn.commit()
+        self._entries = {
+            url: (resolved, resolved_at)
+            for url, resolved, resolved_at in self._conn.execute("SELECT url, resolved, resolved_at FROM redirects")
+        }
+
+    def get(self, url):
+        """Return the cached resolved URL, or None if it is unknown or expired."""
+        entry = self._entries.get(url)
+        with self._lock:
+            if entry and time.time() - entry[1] < self.ttl:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        return None
+
+    def put(self, url, resolved):
+        """Record where a URL's redirects end."""
+        now = time.time()
+        entry = self._entries.get(url)
+        if entry and entry[0] == resolved and now - entry[1] < self.ttl / 2:
+            # Still fresh and unchanged; skip the write.
+            return
+        with self._lock:
+            self._entries[url] = (resolved, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO redirects (url, resolved, resolved_at) VALUES (?, ?, ?)",
+                (url, resolved, now)
+            )
+            self._conn.commit()
+
+    def log_stats(self):
+        """Log hit/miss counters for this run."""
+        logging.info(f"Redirect cache: {self.hits} hits, {self.misses} misses, {len(self._entries)} URLs cached")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
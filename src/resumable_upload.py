@@ -0,0 +1,225 @@
+import logging
+import os
+import random
+import threading
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import quote
+
+import requests
+
+DEFAULT_ENDPOINT = "https://s3.us.archive.org"
+
+
+class UploadError(Exception):
+    """An upload request failed; `retriable` is False for errors another attempt will not fix."""
+
+    def __init__(self, message, retriable=True):
+        super().__init__(message)
+        self.retriable = retriable
+
+
+def _open_binary(path):
+    return open(path, "rb")
+
+
+class _PartReader:
+    """File-like view of `length` bytes of an open file from its current position.
+
+    requests streams it in small reads, so a throttled file paces each part as it is
+    sent instead of buffering the whole part first.
+    """
+
+    def __init__(self, f, length):
+        self._f = f
+        self._remaining = length
+
+    def __len__(self):
+        return self._remaining
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._f.read(size)
+        self._remaining -= len(data)
+        return data
+
+
+def _find_text(xml_text, tag):
+    """Return the text of the first element named tag, ignoring XML namespaces."""
+    for element in ET.fromstring(xml_text).iter():
+        if element.tag.rsplit("}", 1)[-1] == tag:
+            return element.text
+    return None
+
+
+class ResumableUploader:
+    """Upload files to the Internet Archive S3-like API with retries and multipart transfers.
+
+    Files of at least `multipart_threshold` bytes are sent as parts of `part_size`
+    bytes. Every transfer is tracked in an UploadJournal, so a file whose upload was
+    interrupted, even by a restart, resumes from its last completed part. Failed
+    requests are retried with exponential backoff and jitter.
+
+    `endpoint` may point at any S3-compatible server for local testing.
+    """
+
+    def __init__(self, journal, endpoint=DEFAULT_ENDPOINT, access_key=None, secret_key=None,
+                 multipart_threshold=500000000, part_size=100000000, retries=5, backoff=2.0, max_backoff=300,
+                 open_file=_open_binary, timeout=(30, 300)):
+        self.journal = journal
+        self.endpoint = endpoint.rstrip("/")
+        self.multipart_threshold = multipart_threshold
+        # S3 rejects parts smaller than 5 MiB, except the last one.
+        self.part_size = max(part_size, 5 * 1024 * 1024)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.open_file = open_file
+        self.timeout = timeout
+        self.auth_header = f"LOW {access_key}:{secret_key}" if access_key and secret_key else None
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """The calling upload thread's own session."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            if self.auth_header:
+                session.headers["Authorization"] = self.auth_header
+            self._local.session = session
+        return session
+
+    def upload(self, path, item, remote_name, metadata=None):
+        """Upload one file, resuming a previous partial transfer when the journal has one.
+
+        Returns False if the journal shows the file was already uploaded.
+        """
+        size = os.path.getsize(path)
+        if not self.journal.register(path, item, remote_name, size):
+            logging.info(f"Already uploaded according to the journal: {item}/{remote_name}")
+            return False
+
+        self.journal.start(path)
+        try:
+            headers = self._item_headers(metadata, size)
+            if size >= self.multipart_threshold:
+                self._multipart_upload(path, item, remote_name, size, headers)
+            else:
+                self._with_retries(f"{item}/{remote_name}", self._put_file, path, item, remote_name, size, headers)
+        except Exception as e:
+            self.journal.fail(path, e)
+            raise
+        self.journal.finish(path)
+        return True
+
+    def _url(self, item, remote_name):
+        return f"{self.endpoint}/{item}/{quote(remote_name)}"
+
+    def _item_headers(self, metadata, size):
+        headers = {
+            "x-archive-auto-make-bucket": "1",
+            "x-archive-queue-derive": "0",
+            "x-archive-size-hint": str(size),
+        }
+        for key, value in (metadata or {}).items():
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple)):
+                for i, v in enumerate(value):
+                    headers[f"x-archive-meta{i:02d}-{key}"] = str(v)
+            else:
+                headers[f"x-archive-meta-{key}"] = str(value)
+        return headers
+
+    def _with_retries(self, what, func, *args):
+        """Call func(*args), retrying retriable failures with exponential backoff."""
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args)
+            except (requests.RequestException, UploadError) as e:
+                if attempt == self.retries or not getattr(e, "retriable", True):
+                    raise
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1)
+                logging.warning(f"Upload of {what} failed ({e}); retry {attempt + 1}/{self.retries} in {delay:.0f}s")
+                time.sleep(delay)
+
+    def _check(self, response, what):
+        if response.status_code >= 400:
+            retriable = response.status_code >= 500 or response.status_code in (408, 429)
+            raise UploadError(f"{what}: HTTP {response.status_code} {response.text[:200]}", retriable)
+        return response
+
+    def _put_file(self, path, item, remote_name, size, headers):
+        with self.open_file(path) as body:
+            response = self.session.put(
+                self._url(item, remote_name), data=body,
+                headers={**headers, "Content-Length": str(size)}, timeout=self.timeout
+            )
+        self._check(response, f"PUT {item}/{remote_name}")
+
+    def _multipart_upload(self, path, item, remote_name, size, headers):
+        what = f"{item}/{remote_name}"
+        url = self._url(item, remote_name)
+        upload_id = self.journal.upload_id(path)
+        parts = self.journal.parts(path)
+        if upload_id:
+            logging.info(f"Resuming multipart upload of {what}: {len(parts)} parts already sent")
+        else:
+            upload_id = self._with_retries(what, self._initiate, url, headers)
+            self.journal.set_upload_id(path, upload_id)
+
+        num_parts = max(1, -(-size // self.part_size))
+        for part_number in range(1, num_parts + 1):
+            if part_number in parts:
+                continue
+            try:
+                etag = self._with_retries(f"{what} part {part_number}/{num_parts}", self._put_part, path, url, upload_id, part_number)
+            except UploadError as e:
+                if "NoSuchUpload" not in str(e):
+                    raise
+                # The server expired the multipart upload; start over with a new one.
+                logging.warning(f"Multipart upload of {what} expired on the server; restarting it")
+                self.journal.set_upload_id(path, None)
+                return self._multipart_upload(path, item, remote_name, size, headers)
+            parts[part_number] = etag
+            self.journal.record_part(path, part_number, etag)
+
+        self._with_retries(what, self._complete, url, upload_id, parts)
+
+    def _initiate(self, url, headers):
+        response = self._check(self.session.post(f"{url}?uploads", headers=headers, timeout=self.timeout), f"POST {url}?uploads")
+        upload_id = _find_text(response.text, "UploadId")
+        if not upload_id:
+            raise UploadError(f"No UploadId in response to POST {url}?uploads", retriable=False)
+        return upload_id
+
+    def _put_part(self, path, url, upload_id, part_number):
+        offset = (part_number - 1) * self.part_size
+        length = min(self.part_size, os.path.getsize(path) - offset)
+        with self.open_file(path) as f:
+            f.seek(offset)
+            response = self._check(
+                self.session.put(
+                    url, params={"partNumber": part_number, "uploadId": upload_id}, data=_PartReader(f, length),
+                    headers={"Content-Length": str(length)}, timeout=self.timeout
+                ),
+                f"PUT part {part_number}"
+            )
+        return response.headers.get("ETag", "")
+
+    def _complete(self, url, upload_id, parts):
+        body = "<CompleteMultipartUpload>" + "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+            for number, etag in sorted(parts.items())
+        ) + "</CompleteMultipartUpload>"
+        response = self._check(
+            self.session.post(url, params={"uploadId": upload_id}, data=body.encode(), timeout=self.timeout),
+            "complete multipart upload"
+        )
+        # S3 may report an error in the body of a 200 response to CompleteMultipartUpload.
+        if "<Error>" in response.text:
+            raise UploadError(f"complete multipart upload: {response.text[:200]}")
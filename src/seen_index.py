@@ -0,0 +1,74 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+
+
+def url_key(url):
+    """Return a compact signed 64-bit key for a URL."""
+    return int.from_bytes(hashlib.sha1(url.encode("utf-8")).digest()[:8], "big", signed=True)
+
+
+class SeenArticleIndex:
+    """Persistent index of article URLs that were already sent to Browsertrix.
+
+    URLs are stored as 64-bit hashes with the time they were archived. Lookups are
+    served from an in-memory {key: seen_at} dict, and a key older than `window_days`
+    counts as new again, so an article becomes eligible once it falls out of the
+    rolling window even in a long-running process. `prune` drops expired keys from
+    memory and disk; it runs when the index is opened and at the start of each run.
+    """
+
+    def __init__(self, path, window_days=30):
+        self.path = path
+        self.window_days = window_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (key INTEGER PRIMARY KEY, seen_at REAL) WITHOUT ROWID")
+        self._keys = dict(self._conn.execute("SELECT key, seen_at FROM seen"))
+        self.skipped = 0
+        expired = self.prune()
+        logging.info(f"Seen-article index: {len(self._keys)} URLs loaded, {expired} expired")
+
+    def _cutoff(self):
+        return time.time() - self.window_days * 86400
+
+    def prune(self):
+        """Drop keys archived before the window and return how many were removed."""
+        cutoff = self._cutoff()
+        with self._lock:
+            expired = self._conn.execute("DELETE FROM seen WHERE seen_at < ?", (cutoff,)).rowcount
+            self._conn.commit()
+            self._keys = {key: seen_at for key, seen_at in self._keys.items() if seen_at >= cutoff}
+        return expired
+
+    def __contains__(self, url):
+        return self._keys.get(url_key(url), 0) >= self._cutoff()
+
+    def is_new(self, url):
+        """Return True if the URL has not been archived within the window."""
+        if url in self:
+            self.skipped += 1
+            return False
+        return True
+
+    def add_many(self, urls):
+        """Mark URLs as archived now."""
+        now = time.time()
+        keys = {url_key(url) for url in urls}
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO seen (key, seen_at) VALUES (?, ?)",
+                ((key, now) for key in keys)
+            )
+            self._conn.commit()
+            self._keys.update(dict.fromkeys(keys, now))
+
+    def log_stats(self):
+        """Log how many already-archived URLs discovery skipped."""
+        logging.info(f"Seen-article index: skipped {self.skipped} known URLs, {len(self._keys)} URLs indexed")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,64 @@
+import logging
+import os
+import threading
+
+
+class SegmentWatcher:
+    """Hand off Browsertrix WARC segments while the crawl is still running.
+
+    Browsertrix starts a new WARC file once the current one exceeds --rolloverSize and
+    never appends to the old one again. A .warc.gz file in one of `source_dirs` is
+    therefore finished once it has reached `rollover_size` and its size did not change
+    between two polls; `on_segment(path)` is then called once for it. Segments still
+    being written when the crawl ends are left to the caller.
+    """
+
+    def __init__(self, source_dirs, rollover_size, on_segment, poll_interval=30):
+        self.source_dirs = source_dirs
+        self.rollover_size = rollover_size
+        self.on_segment = on_segment
+        self.poll_interval = poll_interval
+        self.handed_off = 0
+        self._sizes = {}
+        self._done = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling and wait for an in-progress hand-off to complete."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logging.error(f"Error watching WARC segments in {self.source_dirs}: {e}")
+
+    def poll(self):
+        """Hand off every segment that became finished since the previous poll."""
+        for source_dir in self.source_dirs:
+            if not os.path.isdir(source_dir):
+                continue
+            for file_name in sorted(os.listdir(source_dir)):
+                if not file_name.endswith(".warc.gz"):
+                    continue
+                path = os.path.join(source_dir, file_name)
+                if path in self._done:
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                previous = self._sizes.get(path)
+                self._sizes[path] = size
+                if size >= self.rollover_size and size == previous:
+                    self._done.add(path)
+                    self.handed_off += 1
+                    self.on_segment(path)
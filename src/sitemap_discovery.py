@@ -0,0 +1,301 @@
+import asyncio
+import datetime
+import json
+import logging
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from urllib.parse import urljoin, urlsplit
+
+import requests
+
+from http_client import HttpClient
+
+NEWS_HINTS = ("news", "article", "post")
+OLDEST = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+
+
+def site_root(website_url):
+    """Return scheme://netloc for a website URL, the key robots.txt results are cached under."""
+    parts = urlsplit(website_url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def follow_entries(sitemap_url, entries, pending, articles):
+    """Queue a sitemap index's children, most recently modified first, and collect its article entries."""
+    children = [(urljoin(sitemap_url, loc), date) for kind, loc, date in entries if kind == "sitemap"]
+    children.sort(key=lambda child: child[1] or OLDEST, reverse=True)
+    pending[:0] = [loc for loc, _ in children]
+    articles.extend((loc, date) for kind, loc, date in entries if kind == "url")
+
+
+def parse_date(value):
+    """Parse a W3C datetime from <lastmod> or <news:publication_date>; returns an aware datetime or None."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def robots_sitemaps(host, text):
+    """Return the sitemap URLs listed in a robots.txt body, news sitemaps first."""
+    sitemaps = []
+    for line in text.splitlines():
+        field, _, value = line.partition(":")
+        if field.strip().lower() == "sitemap" and value.strip():
+            sitemaps.append(urljoin(host, value.strip()))
+    sitemaps.sort(key=lambda url: not any(hint in url.lower() for hint in NEWS_HINTS))
+    return sitemaps
+
+
+class SitemapParser:
+    """Push parser for a sitemap or sitemap index, fed raw bytes as they arrive.
+
+    Gzipped sitemaps are detected from their magic bytes and inflated on the fly.
+    `feed` returns the ("url" or "sitemap", loc, date) tuples completed by a chunk,
+    where date is the news publication date if present and <lastmod> otherwise.
+    The parser is `done` after max_entries entries.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.count = 0
+        self._parser = ET.XMLPullParser(events=("end",))
+        self._inflate = None
+        self._started = False
+        self._loc = self._date = self._lastmod = None
+
+    @property
+    def done(self):
+        return self.count >= self.max_entries
+
+    def feed(self, chunk):
+        if not self._started:
+            self._started = True
+            if chunk[:2] == b"\x1f\x8b":
+                self._inflate = zlib.decompressobj(wbits=31)
+        if self._inflate:
+            chunk = self._inflate.decompress(chunk)
+        self._parser.feed(chunk)
+        return self._entries()
+
+    def close(self):
+        """Finish the document and return any entries completed by its tail."""
+        if self._inflate:
+            self._parser.feed(self._inflate.flush())
+        if not self.done:
+            self._parser.close()
+        return self._entries()
+
+    def _entries(self):
+        entries = []
+        for event, element in self._parser.read_events():
+            if self.done:
+                break
+            tag = element.tag.rsplit("}", 1)[-1]
+            if tag == "loc" and self._loc is None:
+                self._loc = (element.text or "").strip()
+            elif tag == "publication_date":
+                self._date = parse_date(element.text)
+            elif tag == "lastmod":
+                self._lastmod = parse_date(element.text)
+            elif tag in ("url", "sitemap"):
+                if self._loc:
+                    entries.append((tag, self._loc, self._date or self._lastmod))
+                    self.count += 1
+                self._loc = self._date = self._lastmod = None
+                element.clear()
+        return entries
+
+
+def iter_sitemap(stream, max_entries, chunk_size=65536):
+    """Incrementally parse a sitemap or sitemap index from a binary stream.
+
+    Yields the same tuples as SitemapParser.feed and stops reading after max_entries entries.
+    """
+    parser = SitemapParser(max_entries)
+    while not parser.done:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            yield from parser.close()
+            return
+        yield from parser.feed(chunk)
+
+
+def newest_first(articles, limit):
+    """Return up to limit locs from (loc, date) pairs, most recent first."""
+    articles.sort(key=lambda article: article[1] or OLDEST, reverse=True)
+    return [loc for loc, _ in articles[:limit]]
+
+
+class SitemapDiscovery:
+    """Find recent article URLs through the sitemaps advertised in robots.txt.
+
+    The sitemap URLs listed in each host's robots.txt are cached in SQLite for
+    `ttl_days`. News sitemaps are read first, sitemap indexes are followed to their
+    most recently modified children, and article URLs are returned newest first.
+    `candidates_async` does the same on an aiohttp session, parsing in the default
+    executor so the event loop never blocks on the network or the host limiter.
+    """
+
+    def __init__(self, path, ttl_days=7, limiter=None, client=None, max_fetches=3, max_entries=5000, timeout=10):
+        self.ttl = ttl_days * 86400
+        self.limiter = limiter
+        self.client = client or HttpClient()
+        self.max_fetches = max_fetches
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS robots_sitemaps (host TEXT PRIMARY KEY, sitemaps TEXT, fetched_at REAL)")
+        self._conn.execute("DELETE FROM robots_sitemaps WHERE fetched_at < ?", (time.time() - self.ttl,))
+        self._conn.commit()
+        self._hosts = {
+            host: (json.loads(sitemaps), fetched_at)
+            for host, sitemaps, fetched_at in self._conn.execute("SELECT host, sitemaps, fetched_at FROM robots_sitemaps")
+        }
+
+    def _get(self, url, stream=False):
+        if self.limiter:
+            self.limiter.acquire(url)
+        response = self.client.get(url, timeout=self.timeout, stream=stream)
+        response.raise_for_status()
+        return response
+
+    def _cached(self, host):
+        """Return the cached sitemap URLs for a host, or None if they are unknown or expired."""
+        entry = self._hosts.get(host)
+        with self._lock:
+            if entry and time.time() - entry[1] < self.ttl:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        return None
+
+    def _store(self, host, sitemaps):
+        now = time.time()
+        with self._lock:
+            self._hosts[host] = (sitemaps, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO robots_sitemaps (host, sitemaps, fetched_at) VALUES (?, ?, ?)",
+                (host, json.dumps(sitemaps), now)
+            )
+            self._conn.commit()
+        return sitemaps
+
+    def sitemaps_for(self, website_url):
+        """Return the sitemap URLs robots.txt lists for the website's host, news sitemaps first."""
+        host = site_root(website_url)
+        sitemaps = self._cached(host)
+        if sitemaps is not None:
+            return sitemaps
+
+        try:
+            response = self._get(urljoin(host, "/robots.txt"))
+        except requests.HTTPError as e:
+            logging.debug(f"No robots.txt for {host}: {e}")
+            return self._store(host, [])
+        except requests.RequestException as e:
+            # Do not cache network failures; the host is tried again next time.
+            logging.debug(f"Failed to fetch robots.txt for {host}: {e}")
+            return []
+        return self._store(host, robots_sitemaps(host, response.text))
+
+    def _read(self, sitemap_url):
+        """Fetch and incrementally parse one sitemap; returns its entries."""
+        response = self._get(sitemap_url, stream=True)
+        try:
+            response.raw.decode_content = True
+            return list(iter_sitemap(response.raw, self.max_entries))
+        finally:
+            response.close()
+
+    def candidates(self, website_url, limit=100):
+        """Return up to limit article URLs from the website's sitemaps, newest first."""
+        pending = list(self.sitemaps_for(website_url))
+        articles = []
+        fetches = 0
+        while pending and fetches < self.max_fetches:
+            sitemap_url = pending.pop(0)
+            fetches += 1
+            try:
+                entries = self._read(sitemap_url)
+            except (requests.RequestException, ET.ParseError, OSError, EOFError, zlib.error) as e:
+                logging.warning(f"Failed to read sitemap {sitemap_url}: {e}")
+                continue
+            follow_entries(sitemap_url, entries, pending, articles)
+        return newest_first(articles, limit)
+
+    async def sitemaps_for_async(self, session, website_url):
+        """Async counterpart of sitemaps_for using an aiohttp session."""
+        import aiohttp
+
+        host = site_root(website_url)
+        sitemaps = self._cached(host)
+        if sitemaps is not None:
+            return sitemaps
+
+        robots_url = urljoin(host, "/robots.txt")
+        try:
+            if self.limiter:
+                await self.limiter.acquire_async(robots_url)
+            async with session.get(robots_url, raise_for_status=True) as response:
+                text = await response.text(errors="replace")
+        except aiohttp.ClientResponseError as e:
+            logging.debug(f"No robots.txt for {host}: {e}")
+            return self._store(host, [])
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Do not cache network failures; the host is tried again next time.
+            logging.debug(f"Failed to fetch robots.txt for {host}: {e}")
+            return []
+        return self._store(host, robots_sitemaps(host, text))
+
+    async def _read_async(self, session, sitemap_url):
+        """Stream one sitemap from an aiohttp session, parsing each chunk in the default executor."""
+        loop = asyncio.get_running_loop()
+        parser = SitemapParser(self.max_entries)
+        entries = []
+        if self.limiter:
+            await self.limiter.acquire_async(sitemap_url)
+        async with session.get(sitemap_url, raise_for_status=True) as response:
+            async for chunk in response.content.iter_chunked(65536):
+                entries.extend(await loop.run_in_executor(None, parser.feed, chunk))
+                if parser.done:
+                    return entries
+        entries.extend(await loop.run_in_executor(None, parser.close))
+        return entries
+
+    async def candidates_async(self, session, website_url, limit=100):
+        """Async counterpart of candidates using an aiohttp session."""
+        import aiohttp
+
+        pending = list(await self.sitemaps_for_async(session, website_url))
+        articles = []
+        fetches = 0
+        while pending and fetches < self.max_fetches:
+            sitemap_url = pending.pop(0)
+            fetches += 1
+            try:
+                entries = await self._read_async(session, sitemap_url)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ET.ParseError, zlib.error) as e:
+                logging.warning(f"Failed to read sitemap {sitemap_url}: {e}")
+                continue
+            follow_entries(sitemap_url, entries, pending, articles)
+        return newest_first(articles, limit)
+
+    def log_stats(self):
+        """Log robots.txt cache hit/miss counters for this run."""
+        logging.info(f"Sitemap discovery: {self.hits} robots.txt cache hits, {self.misses} misses, {len(self._hosts)} hosts cached")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,153 @@
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from importlib.metadata import version, PackageNotFoundError
+from urllib.parse import urlparse
+
+import pandas as pd
+import tldextract
+from storysniffer import StorySniffer
+
+
+def storysniffer_version():
+    """Return the installed storysniffer version, used to invalidate persisted verdicts."""
+    try:
+        return version("storysniffer")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class BatchStorySniffer(StorySniffer):
+    """StorySniffer that classifies URLs in batches behind an LRU verdict cache.
+
+    `guess_many` applies the same blacklist rules and path-only model as
+    `StorySniffer.guess`, but scores every URL that reaches the model with a single
+    `predict` call. Verdicts are memoized and can be saved to / loaded from a gzipped
+    JSON file so they survive across runs.
+    """
+
+    def __init__(self, cache_path=None, max_cache_size=200000):
+        super().__init__()
+        self.cache_path = cache_path
+        self.max_cache_size = max_cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_path:
+            self.load()
+
+    def _rule_verdict(self, url):
+        """Return the rule-based verdict for a URL, or None when the model must decide."""
+        if not url or not url.strip():
+            return False
+
+        path = urlparse(url).path
+        tld = tldextract.extract(url)
+        if tld.domain in self.DOMAIN_BLACKLIST:
+            return False
+        elif tld.subdomain in self.SUBDOMAIN_BLACKLIST:
+            return False
+        elif path in self.PATH_BLACKLIST:
+            return False
+        elif os.path.splitext(path)[1] in self.EXT_BLACKLIST:
+            return False
+        return None
+
+    def _adjust(self, path, prediction):
+        """Apply StorySniffer's whitelist / blacklist overrides to a model prediction."""
+        if not prediction:
+            if path.startswith(self.PATHPART_WHITELIST) and len(path) > 10:
+                if "-" in path or path.endswith(".html"):
+                    return True
+        if prediction and path.startswith(self.PATHPART_BLACKLIST):
+            return False
+        return bool(prediction)
+
+    def guess_many(self, urls):
+        """Estimate for each URL whether it links to a news story."""
+        verdicts = {}
+        pending = []
+        with self._lock:
+            for url in urls:
+                if url in verdicts:
+                    continue
+                if url in self._cache:
+                    self._cache.move_to_end(url)
+                    verdicts[url] = self._cache[url]
+                    self.hits += 1
+                else:
+                    verdicts[url] = None
+                    pending.append(url)
+            self.misses += len(pending)
+
+        to_model = []
+        for url in pending:
+            verdict = self._rule_verdict(url)
+            if verdict is None:
+                to_model.append(url)
+            else:
+                verdicts[url] = verdict
+
+        if to_model:
+            paths = [urlparse(url).path for url in to_model]
+            data = pd.DataFrame({"path": paths, "text": [None] * len(paths)})
+            predictions = self.path_only_model.predict(data)
+            for url, path, prediction in zip(to_model, paths, predictions):
+                verdicts[url] = self._adjust(path, bool(prediction == 1))
+
+        with self._lock:
+            for url in pending:
+                self._cache[url] = verdicts[url]
+            while len(self._cache) > self.max_cache_size:
+                self._cache.popitem(last=False)
+
+        return [verdicts[url] for url in urls]
+
+    def guess(self, url, text=None):
+        """Estimate if the provided URL links to a news story, using the verdict cache."""
+        if text:
+            return super().guess(url, text)
+        return self.guess_many([url])[0]
+
+    def load(self):
+        """Load persisted verdicts if they were produced by the same storysniffer version."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with gzip.open(self.cache_path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not load sniffer cache {self.cache_path}: {e}")
+            return
+        if data.get("version") != storysniffer_version():
+            logging.info("Sniffer cache was built by another storysniffer version. Ignoring it.")
+            return
+        with self._lock:
+            self._cache = OrderedDict(data.get("verdicts", []))
+        logging.info(f"Loaded {len(self._cache)} cached sniffer verdicts")
+
+    def save(self):
+        """Persist the verdict cache, most recently used last. A failed save is logged, not raised."""
+        if not self.cache_path:
+            return
+        with self._lock:
+            verdicts = list(self._cache.items())
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump({"version": storysniffer_version(), "verdicts": verdicts}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning(f"Could not save sniffer cache {self.cache_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def log_stats(self):
+        """Log verdict cache hit/miss counters."""
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0.0
+        logging.info(f"Sniffer cache: {self.hits} hits, {self.misses} misses ({ratio:.1%} hit rate), {len(self._cache)} verdicts cached")
@@ -0,0 +1,131 @@
+import logging
+import sqlite3
+import threading
+import time
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+UPLOADED = "uploaded"
+FAILED = "failed"
+MISSING = "missing"
+
+
+class UploadJournal:
+    """Persistent record of every file queued for upload and how far it got.
+
+    Each file is pending, in_flight, uploaded, failed or missing (the local file was gone
+    when a resume was attempted). Multipart uploads also keep their upload id and the
+    ETags of completed parts, so an interrupted transfer continues where it stopped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS uploads ("
+            "path TEXT PRIMARY KEY, item TEXT, remote_name TEXT, size INTEGER, status TEXT, "
+            "attempts INTEGER DEFAULT 0, upload_id TEXT, error TEXT, updated_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS upload_parts (path TEXT, part_number INTEGER, etag TEXT, PRIMARY KEY (path, part_number))"
+        )
+        self._conn.commit()
+
+    def register(self, path, item, remote_name, size):
+        """Record a file as pending unless it is already uploaded with the same size.
+
+        Returns False when the file does not need to be uploaded again.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT item, remote_name, size, status FROM uploads WHERE path = ?", (path,)
+            ).fetchone()
+            if row and row[3] == UPLOADED and row[:3] == (item, remote_name, size):
+                return False
+            if row and row[:3] == (item, remote_name, size):
+                # Same file as before; keep the multipart upload id and parts for resuming.
+                self._conn.execute(
+                    "UPDATE uploads SET status = ?, updated_at = ? WHERE path = ?", (PENDING, time.time(), path)
+                )
+            else:
+                self._conn.execute("DELETE FROM upload_parts WHERE path = ?", (path,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO uploads (path, item, remote_name, size, status, attempts, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, 0, ?)",
+                    (path, item, remote_name, size, PENDING, time.time())
+                )
+            self._conn.commit()
+        return True
+
+    def start(self, path):
+        """Mark a file as in flight and count the attempt."""
+        self._execute(
+            "UPDATE uploads SET status = ?, attempts = attempts + 1, error = NULL, updated_at = ? WHERE path = ?",
+            (IN_FLIGHT, time.time(), path)
+        )
+
+    def finish(self, path):
+        """Mark a file as uploaded and drop its multipart state."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE uploads SET status = ?, upload_id = NULL, error = NULL, updated_at = ? WHERE path = ?",
+                (UPLOADED, time.time(), path)
+            )
+            self._conn.execute("DELETE FROM upload_parts WHERE path = ?", (path,))
+            self._conn.commit()
+
+    def fail(self, path, error, status=FAILED):
+        """Mark a file as failed (or missing); its multipart state is kept for the next attempt."""
+        self._execute(
+            "UPDATE uploads SET status = ?, error = ?, updated_at = ? WHERE path = ?",
+            (status, str(error)[:1000], time.time(), path)
+        )
+
+    def upload_id(self, path):
+        """Return the multipart upload id of a file, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT upload_id FROM uploads WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else None
+
+    def set_upload_id(self, path, upload_id):
+        """Store (or with None, clear) the multipart upload id of a file and forget its parts."""
+        with self._lock:
+            self._conn.execute("UPDATE uploads SET upload_id = ? WHERE path = ?", (upload_id, path))
+            self._conn.execute("DELETE FROM upload_parts WHERE path = ?", (path,))
+            self._conn.commit()
+
+    def parts(self, path):
+        """Return {part_number: etag} of the completed parts of a multipart upload."""
+        with self._lock:
+            rows = self._conn.execute("SELECT part_number, etag FROM upload_parts WHERE path = ?", (path,)).fetchall()
+        return dict(rows)
+
+    def record_part(self, path, part_number, etag):
+        self._execute(
+            "INSERT OR REPLACE INTO upload_parts (path, part_number, etag) VALUES (?, ?, ?)", (path, part_number, etag)
+        )
+
+    def unfinished(self):
+        """Return (path, item, remote_name) of files that were queued but never uploaded."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT path, item, remote_name FROM uploads WHERE status IN (?, ?, ?) ORDER BY updated_at",
+                (PENDING, IN_FLIGHT, FAILED)
+            ).fetchall()
+
+    def log_stats(self):
+        """Log how many journaled files are in each status."""
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM uploads GROUP BY status").fetchall())
+        summary = ", ".join(f"{counts.get(status, 0)} {status}" for status in (UPLOADED, PENDING, IN_FLIGHT, FAILED, MISSING))
+        logging.info(f"Upload journal: {summary}")
+
+    def _execute(self, sql, params):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,134 @@
+import concurrent.futures
+import io
+import logging
+import os
+import threading
+import time
+
+
+class BandwidthLimiter:
+    """Token bucket shared by all uploads that caps their combined bytes per second."""
+
+    def __init__(self, bytes_per_second):
+        self.bytes_per_second = bytes_per_second
+        self._allowance = 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, nbytes):
+        """Block until nbytes may be sent."""
+        if not self.bytes_per_second or nbytes <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            # Allow at most one second of burst.
+            self._allowance = min(self.bytes_per_second, self._allowance + (now - self._last) * self.bytes_per_second)
+            self._last = now
+            self._allowance -= nbytes
+            delay = -self._allowance / self.bytes_per_second if self._allowance < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+
+
+class ThrottledFile(io.FileIO):
+    """Read-only file whose reads are paced by a BandwidthLimiter."""
+
+    def __init__(self, path, limiter):
+        super().__init__(path, "rb")
+        self.limiter = limiter
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.limiter.consume(len(data))
+        return data
+
+    def readinto(self, buffer):
+        count = super().readinto(buffer)
+        if count:
+            self.limiter.consume(count)
+        return count
+
+
+class UploadScheduler:
+    """Process-wide upload queue with a fixed concurrency limit and an optional bandwidth cap.
+
+    Queued-but-unfinished bytes are tracked so producers can call `wait_for_capacity`
+    and pause while more than `max_pending_bytes` are waiting to be uploaded.
+    """
+
+    def __init__(self, max_concurrent=5, bytes_per_second=0, max_pending_bytes=0):
+        self.max_concurrent = max_concurrent
+        self.max_pending_bytes = max_pending_bytes
+        self.bandwidth = BandwidthLimiter(bytes_per_second)
+        self.pending_files = 0
+        self.pending_bytes = 0
+        self._pending_paths = set()
+        self._condition = threading.Condition()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="upload")
+        self.on_change = None
+
+    def configure(self, max_concurrent, bytes_per_second, max_pending_bytes):
+        """Apply command line limits; must be called before anything is submitted."""
+        if max_concurrent != self.max_concurrent:
+            self._executor.shutdown(wait=True)
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="upload")
+            self.max_concurrent = max_concurrent
+        self.bandwidth.bytes_per_second = bytes_per_second
+        self.max_pending_bytes = max_pending_bytes
+
+    def open(self, path):
+        """Open a file for upload, paced by the bandwidth cap when one is set."""
+        if self.bandwidth.bytes_per_second:
+            return ThrottledFile(path, self.bandwidth)
+        return open(path, "rb")
+
+    def submit(self, path, func, *args):
+        """Queue func(*args) as the upload of path; returns a Future, or None if path is already queued."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+
+        with self._condition:
+            if path in self._pending_paths:
+                return None
+            self._pending_paths.add(path)
+            self.pending_files += 1
+            self.pending_bytes += size
+        self._changed()
+
+        def run():
+            try:
+                return func(*args)
+            finally:
+                with self._condition:
+                    self._pending_paths.discard(path)
+                    self.pending_files -= 1
+                    self.pending_bytes -= size
+                    self._condition.notify_all()
+                self._changed()
+
+        return self._executor.submit(run)
+
+    def wait_for_capacity(self, what):
+        """Block while queued uploads exceed max_pending_bytes."""
+        if not self.max_pending_bytes:
+            return
+        with self._condition:
+            if self.pending_bytes <= self.max_pending_bytes:
+                return
+            logging.warning(
+                f"Pausing {what}: {self.pending_bytes / 1e9:.1f} GB in {self.pending_files} files waiting to upload"
+            )
+            start = time.time()
+            while self.pending_bytes > self.max_pending_bytes:
+                self._condition.wait()
+        logging.info(f"Resuming {what} after {time.time() - start:.0f}s of upload backpressure")
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change(self.pending_files, self.pending_bytes)
+
+    def log_stats(self):
+        """Log the current upload queue depth."""
+        logging.info(f"Upload queue: {self.pending_files} files, {self.pending_bytes / 1e9:.2f} GB pending")
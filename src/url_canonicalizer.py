@@ -0,0 +1,89 @@
+from urllib.parse import urlsplit, urlunsplit
+
+# Query parameters that only track the referrer or campaign and never change the page.
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "gclsrc", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ocid", "cmpid", "sr_share", "smid", "mbid",
+})
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url):
+    """Return url with a lower-case scheme and host, no default port, fragment, tracking parameters or trailing slash."""
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if not host:
+        return url
+
+    netloc = f"[{host}]" if ":" in host else host
+    if parts.username is not None:
+        userinfo = parts.username + (f":{parts.password}" if parts.password is not None else "")
+        netloc = f"{userinfo}@{netloc}"
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+
+    return urlunsplit((scheme, netloc, path, _strip_tracking_params(parts.query), ""))
+
+
+def _is_tracking(name):
+    return name.startswith("utm_") or name in TRACKING_PARAMS
+
+
+def _strip_tracking_params(query):
+    if not query:
+        return query
+    return "&".join(
+        param for param in query.split("&")
+        if param and not _is_tracking(param.split("=", 1)[0].lower())
+    )
+
+
+def strip_tracking(url):
+    """Return url without its fragment and tracking parameters, otherwise unchanged."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, _strip_tracking_params(parts.query), ""))
+
+
+def _upgrade_to_https(url):
+    """Switch an http URL to https, dropping the explicit default http port."""
+    parts = urlsplit(url)
+    netloc = parts.netloc
+    try:
+        if parts.port == 80:
+            netloc = netloc.rsplit(":", 1)[0]
+    except ValueError:
+        pass
+    return urlunsplit(("https", netloc, parts.path, parts.query, parts.fragment))
+
+
+def dedupe_urls(urls):
+    """Drop URLs whose canonical form was already seen, keeping the first occurrence of each.
+
+    The canonical form is only the comparison key: the URL kept is the first one seen,
+    with its fragment and tracking parameters removed, so paths keep their trailing
+    slash. http and https variants count as duplicates, and the kept URL switches to
+    https when an https variant appears. Returns the URLs in their original order.
+    """
+    index = {}
+    unique = []
+    for url in urls:
+        key = canonicalize_url(url).split("://", 1)[-1]
+        position = index.get(key)
+        if position is None:
+            index[key] = len(unique)
+            unique.append(strip_tracking(url))
+        elif unique[position].lower().startswith("http://") and url.strip().lower().startswith("https://"):
+            unique[position] = _upgrade_to_https(unique[position])
+    return unique
@@ -0,0 +1,140 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+
+class LeaseQueue:
+    """Work queue in an SQLite file on a shared filesystem, handed out under renewable leases.
+
+    Every node adds the same tasks for a round (duplicates are ignored) and then claims
+    small batches. A claimed task belongs to its node until the lease expires; a node
+    that dies stops renewing, so its tasks become claimable again. A task whose lease
+    expires after `max_attempts` claims is marked failed.
+    """
+
+    def __init__(self, path, owner, lease_seconds=900, max_attempts=3):
+        self.path = path
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._held = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._renewer = None
+        # Rollback journal instead of WAL: WAL needs shared memory, which network filesystems lack.
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id INTEGER PRIMARY KEY, round TEXT, key TEXT, payload TEXT, status TEXT DEFAULT 'pending', "
+            "owner TEXT, lease_expires REAL, attempts INTEGER DEFAULT 0, UNIQUE (round, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (round, status, lease_expires)")
+
+    def _transaction(self, func):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func()
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def populate(self, round_id, tasks):
+        """Add (key, payload) tasks to a round; tasks another node already added are ignored."""
+        def insert():
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tasks (round, key, payload) VALUES (?, ?, ?)",
+                ((round_id, key, json.dumps(payload)) for key, payload in tasks)
+            )
+        self._transaction(insert)
+
+    def claim(self, round_id, batch_size):
+        """Lease up to batch_size pending or expired tasks; returns [(task id, payload)]."""
+        def take():
+            now = time.time()
+            self._conn.execute(
+                "UPDATE tasks SET status = 'failed', lease_expires = NULL "
+                "WHERE round = ? AND status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (round_id, now, self.max_attempts)
+            )
+            rows = self._conn.execute(
+                "SELECT id, payload FROM tasks WHERE round = ? AND attempts < ? "
+                "AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) ORDER BY id LIMIT ?",
+                (round_id, self.max_attempts, now, batch_size)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE tasks SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                ((self.owner, now + self.lease_seconds, task_id) for task_id, _ in rows)
+            )
+            return rows
+        rows = self._transaction(take)
+        with self._lock:
+            self._held.update(task_id for task_id, _ in rows)
+        return [(task_id, json.loads(payload)) for task_id, payload in rows]
+
+    def complete(self, task_id):
+        """Mark a leased task as done."""
+        self._finish(task_id, "done")
+
+    def release(self, task_id):
+        """Hand a leased task back so another node can claim it, or mark it failed if it is out of attempts."""
+        self._finish(task_id, "pending")
+
+    def _finish(self, task_id, status):
+        def update():
+            self._conn.execute(
+                "UPDATE tasks SET status = CASE WHEN ? = 'pending' AND attempts >= ? THEN 'failed' ELSE ? END, "
+                "lease_expires = NULL WHERE id = ? AND owner = ?",
+                (status, self.max_attempts, status, task_id, self.owner)
+            )
+        self._transaction(update)
+        with self._lock:
+            self._held.discard(task_id)
+
+    def renew(self):
+        """Extend the leases of every task this node holds."""
+        with self._lock:
+            held = list(self._held)
+        if not held:
+            return
+        def update():
+            self._conn.executemany(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+                ((time.time() + self.lease_seconds, task_id, self.owner) for task_id in held)
+            )
+        self._transaction(update)
+
+    def start_renewing(self):
+        """Renew held leases in a background thread every third of the lease period."""
+        def run():
+            while not self._stop.wait(self.lease_seconds / 3):
+                try:
+                    self.renew()
+                except sqlite3.Error as e:
+                    logging.error(f"Could not renew work leases: {e}")
+        self._renewer = threading.Thread(target=run, daemon=True)
+        self._renewer.start()
+
+    def counts(self, round_id):
+        """Return {status: number of tasks} for a round; leases that have expired are not counted as leased."""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT CASE WHEN status = 'leased' AND lease_expires < ? THEN 'expired' ELSE status END AS state, COUNT(*) "
+                "FROM tasks WHERE round = ? GROUP BY state",
+                (time.time(), round_id)
+            ).fetchall())
+
+    def close(self):
+        self._stop.set()
+        if self._renewer:
+            self._renewer.join()
+        with self._lock:
+            held = list(self._held)
+        for task_id in held:
+            self.release(task_id)
+        with self._lock:
+            self._conn.close()